@@ -0,0 +1,154 @@
+import asyncio
+import contextvars
+import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    MethodNotAllowed,
+    NotAuthenticated,
+    NotFound
+)
+
+from api.pagination import OffsetOrCursorPagination
+from api.routers import call_db
+from api.serializers import (
+    CommentsSerializer, ReviewsSerializer, TitleSerializer
+)
+from api.views import CommentsViewSet, ReviewsViewSet, TitleViewSet
+
+# Синхронный ORM из асинхронных представлений выполняется в этом пуле:
+# не больше ASYNC_DB_WORKERS запросов к БД одновременно.
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_DB_WORKERS, thread_name_prefix='async-db'
+)
+
+
+async def run_db(func, *args):
+    """Выполняет func в пуле с контекстом запроса (реплика для чтения)."""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, partial(context.run, call_db, func, *args)
+    )
+
+
+def error_response(exception):
+    detail = exception.detail
+    response = JsonResponse(
+        detail if isinstance(detail, dict) else {'detail': str(detail)},
+        status=exception.status_code
+    )
+    for header, value in (
+        ('WWW-Authenticate', getattr(exception, 'auth_header', None)),
+        ('Retry-After', getattr(exception, 'wait', None)),
+    ):
+        if value is not None:
+            response[header] = (
+                value if isinstance(value, str) else str(math.ceil(value))
+            )
+    return response
+
+
+def get_only(view_class, action):
+    """
+    Асинхронные представления только читают, в том числе из реплик.
+    Аутентификация, права и ограничение запросов — те же, что у
+    действия action синхронного view_class: его initial() выполняется
+    в пуле до ответа.
+    """
+
+    def decorator(view):
+
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return error_response(MethodNotAllowed(request.method))
+            drf_view = view_class(
+                action_map={'get': action}, args=args, kwargs=kwargs,
+                format_kwarg=None, headers={}
+            )
+            drf_request = drf_view.initialize_request(
+                request, *args, **kwargs
+            )
+            drf_view.request = drf_request
+            try:
+                await run_db(
+                    partial(drf_view.initial, drf_request, *args, **kwargs)
+                )
+            except APIException as exception:
+                if isinstance(
+                    exception, (NotAuthenticated, AuthenticationFailed)
+                ):
+                    exception.auth_header = drf_view.get_authenticate_header(
+                        drf_request
+                    )
+                return error_response(exception)
+            return await view(drf_request, *args, **kwargs)
+
+        wrapper.read_from_replica = True
+        return wrapper
+
+    return decorator
+
+
+async def paginated_response(request, exists, queryset, serializer_class):
+    """
+    Проверка родителя, количество и страница — три независимых запроса,
+    они выполняются одновременно. Ответ как у пагинации по смещению.
+    """
+    paginator = OffsetOrCursorPagination()
+    paginator.request = request
+    paginator.limit = paginator.get_limit(paginator.request)
+    paginator.offset = paginator.get_offset(paginator.request)
+    page = queryset[paginator.offset:paginator.offset + paginator.limit]
+    found, paginator.count, results = await asyncio.gather(
+        run_db(exists),
+        run_db(queryset.count),
+        run_db(lambda: serializer_class(page, many=True).data)
+    )
+    if not found:
+        return error_response(NotFound())
+    return JsonResponse({
+        'count': paginator.count,
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'results': results,
+    })
+
+
+@get_only(TitleViewSet, 'retrieve')
+async def title_detail(request, title_id):
+    def load():
+        title = TitleViewSet.queryset.filter(pk=title_id).first()
+        return None if title is None else TitleSerializer(title).data
+
+    data = await run_db(load)
+    if data is None:
+        return error_response(NotFound())
+    return JsonResponse(data)
+
+
+@get_only(ReviewsViewSet, 'list')
+async def review_list(request, title_id):
+    return await paginated_response(
+        request,
+        TitleViewSet.queryset.filter(pk=title_id).exists,
+        ReviewsViewSet.queryset.filter(title_id=title_id),
+        ReviewsSerializer
+    )
+
+
+@get_only(CommentsViewSet, 'list')
+async def comment_list(request, title_id, review_id):
+    return await paginated_response(
+        request,
+        ReviewsViewSet.queryset.filter(
+            pk=review_id, title_id=title_id
+        ).exists,
+        CommentsViewSet.queryset.filter(review_id=review_id),
+        CommentsSerializer
+    )
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed, InvalidToken
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import CustomUser
+
+# Поля пользователя, которых хватает для проверки прав.
+SNAPSHOT_FIELDS = (
+    'id', 'username', 'role', 'is_staff', 'is_superuser', 'is_active'
+)
+ROLE_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser')
+
+
+class UserSnapshotCache:
+    """
+    Ограниченный LRU-кэш снимков пользователей в памяти процесса.
+    Записи живут AUTH_USER_CACHE_TTL секунд и сбрасываются сигналами
+    CustomUser только в своем процессе; изменения через
+    QuerySet.update() вступают в силу по истечении TTL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires, values = entry
+            if expires <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return values
+
+    def set(self, user_id, values):
+        expires = time.monotonic() + settings.AUTH_USER_CACHE_TTL
+        with self._lock:
+            self._entries[user_id] = (expires, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > settings.AUTH_USER_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserSnapshotCache()
+
+
+def make_user(values):
+    """
+    Пользователь только с полями снимка: остальные поля отложены и
+    загрузятся при обращении, save() запишет только загруженные поля.
+    """
+    # from_db ждет значения в порядке полей модели.
+    fields = [
+        field.attname for field in CustomUser._meta.concrete_fields
+        if field.attname in SNAPSHOT_FIELDS
+    ]
+    return CustomUser.from_db(
+        DEFAULT_DB_ALIAS, fields, [values[field] for field in fields]
+    )
+
+
+def make_access_token(user):
+    """Токен доступа; с JWT_ROLE_CLAIMS в нем же роль пользователя."""
+    token = AccessToken.for_user(user)
+    if settings.JWT_ROLE_CLAIMS:
+        for claim in ROLE_CLAIMS:
+            token[claim] = getattr(user, claim)
+    return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса пользователя на каждый запрос:
+    снимок берется из роли в токене (JWT_ROLE_CLAIMS) или из кэша.
+    """
+
+    def get_snapshot(self, user_id, validated_token):
+        if settings.JWT_ROLE_CLAIMS and all(
+            claim in validated_token for claim in ROLE_CLAIMS
+        ):
+            return {
+                'id': user_id,
+                'is_active': True,
+                **{claim: validated_token[claim] for claim in ROLE_CLAIMS}
+            }
+        values = user_cache.get(user_id)
+        if values is None:
+            values = CustomUser.objects.filter(pk=user_id).values(
+                *SNAPSHOT_FIELDS
+            ).first()
+            if values is None:
+                raise AuthenticationFailed(
+                    'Пользователь не найден', code='user_not_found'
+                )
+            user_cache.set(user_id, values)
+        return values
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'В токене нет идентификатора пользователя'
+            )
+        values = self.get_snapshot(user_id, validated_token)
+        if not values['is_active']:
+            raise AuthenticationFailed(
+                'Пользователь неактивен', code='user_inactive'
+            )
+        return make_user(values)
@@ -0,0 +1,126 @@
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.views import APIView
+
+from api.middleware import get_query_budget, resolve_action
+from api.routers import call_db, get_read_alias, read_alias
+
+# Заголовки пакетного запроса, которые не относятся к вложенным GET.
+SKIPPED_META = (
+    'CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IF_NONE_MATCH',
+    'HTTP_IF_MODIFIED_SINCE', 'wsgi.input',
+)
+
+logger = logging.getLogger('api.query_budget')
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.BATCH_WORKERS, thread_name_prefix='batch'
+)
+
+
+def make_subrequest(request, url):
+    """GET-запрос к url с заголовками (и авторизацией) вызывающего."""
+    parts = urlsplit(url)
+    environ = {
+        key: value for key, value in request.META.items()
+        if key not in SKIPPED_META
+    }
+    environ.update({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': parts.path,
+        'QUERY_STRING': parts.query,
+        'wsgi.input': BytesIO(),
+        'wsgi.url_scheme': request.scheme,
+    })
+    return WSGIRequest(environ)
+
+
+def error(status_code, detail):
+    return {'status': status_code, 'body': {'detail': detail}}
+
+
+def get_view(path):
+    """Представление DRF по пути; асинхронные и потоковые не подходят."""
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None or not issubclass(view_class, APIView):
+        return None
+    return match
+
+
+class QueryCounter:
+    """Считает SQL-запросы соединений текущего потока."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def dispatch(request, url):
+    """
+    Выполняет вложенный запрос тем же представлением, что и обычный,
+    минуя middleware. Возвращает статус и данные ответа и число
+    SQL-запросов; в режиме DEBUG пишет в лог превышение бюджета
+    представления, как QueryBudgetMiddleware.
+    """
+    match = get_view(urlsplit(url).path)
+    if match is None:
+        return error(status.HTTP_404_NOT_FOUND, 'Страница не найдена.'), 0
+    subrequest = make_subrequest(request, url)
+    alias = get_read_alias(subrequest, match.func.cls)
+    if alias is not None:
+        read_alias.set(alias)
+    counter = QueryCounter()
+    with ExitStack() as stack:
+        for db in connections:
+            stack.enter_context(connections[db].execute_wrapper(counter))
+        response = match.func(subrequest, *match.args, **match.kwargs)
+    action = resolve_action(match.func, 'GET')
+    budget = get_query_budget(match.func.cls, action)
+    if settings.DEBUG and budget is not None and counter.count > budget:
+        logger.warning(
+            'Превышен бюджет SQL-запросов: GET %s (%s) в пакете — %s из %s',
+            subrequest.path, action, counter.count, budget
+        )
+    if response.streaming:
+        response.close()
+        return error(
+            status.HTTP_400_BAD_REQUEST,
+            'Потоковые ответы недоступны в пакетном запросе.'
+        ), counter.count
+    return {
+        'status': response.status_code,
+        'body': getattr(response, 'data', None),
+    }, counter.count
+
+
+def run_batch(request, urls):
+    """
+    Вложенные запросы независимы и выполняются параллельно в пуле
+    BATCH_WORKERS, каждый со своим соединением с БД и копией контекста.
+    Ответы возвращаются в порядке запросов, число SQL-запросов каждого
+    сохраняется в request.subrequest_queries.
+    """
+    def run(url):
+        context = contextvars.copy_context()
+        return context.run(call_db, dispatch, request, url)
+
+    results = list(executor.map(run, urls))
+    request.subrequest_queries = [queries for _, queries in results]
+    return [result for result, _ in results]
@@ -0,0 +1,536 @@
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import count, islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment
+)
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import cache
+from reviews.catalog import title_catalog
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.ratings import rebuild_title_ratings
+from reviews.search import rebuild_search_index
+from users.constants import ADMIN, USER
+from users.models import CustomUser
+
+BATCH_SIZE = 5000
+REVIEWS_PER_TITLE = 50
+CATEGORIES = 5
+GENRES = 10
+GENRES_PER_TITLE = 2
+COMMENTS_PER_REVIEW = 0.1
+PERCENTILES = (50, 95, 99)
+
+
+@contextmanager
+def test_database():
+    """
+    Временная тестовая БД для замеров. Соединение переключается на нее
+    до первого запроса, поэтому рабочая БД (и файл SQLite) не
+    открывается; реплики отключены, все чтение идет в тестовую БД.
+    """
+    old_name = connection.settings_dict['NAME']
+    setup_test_environment()
+    connection.close()
+    connection.settings_dict['NAME'] = (
+        connection.creation._get_test_db_name()
+    )
+    try:
+        with override_settings(DATABASE_REPLICAS=[]):
+            connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                yield
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+    finally:
+        connection.settings_dict['NAME'] = old_name
+        teardown_test_environment()
+
+
+def bulk_insert(model, objects):
+    objects = iter(objects)
+    while True:
+        batch = list(islice(objects, BATCH_SIZE))
+        if not batch:
+            return
+        model.objects.bulk_create(batch)
+
+
+def seed_dataset(reviews):
+    """
+    Заполняет БД синтетическими данными: на каждое произведение
+    приходится REVIEWS_PER_TITLE отзывов от разных авторов.
+    """
+    titles = max(10, reviews // REVIEWS_PER_TITLE)
+    authors = max(1, math.ceil(reviews / titles))
+    password = make_password(None)
+    bulk_insert(CustomUser, (
+        CustomUser(
+            username=f'bench_user_{number}',
+            email=f'bench_user_{number}@yamdb.fake',
+            password=password
+        ) for number in range(authors)
+    ))
+    bulk_insert(Category, (
+        Category(name=f'Категория {number}', slug=f'bench-category-{number}')
+        for number in range(CATEGORIES)
+    ))
+    bulk_insert(Genre, (
+        Genre(name=f'Жанр {number}', slug=f'bench-genre-{number}')
+        for number in range(GENRES)
+    ))
+    category_ids = list(Category.objects.values_list('id', flat=True))
+    genre_ids = list(Genre.objects.values_list('id', flat=True))
+    bulk_insert(Title, (
+        Title(
+            name=f'Произведение {number}',
+            year=1900 + number % 120,
+            description=f'Описание произведения {number}',
+            category_id=category_ids[number % len(category_ids)]
+        ) for number in range(titles)
+    ))
+    title_ids = list(
+        Title.objects.order_by('id').values_list('id', flat=True)
+    )
+    author_ids = list(
+        CustomUser.objects.filter(
+            username__startswith='bench_user_'
+        ).order_by('id').values_list('id', flat=True)
+    )
+    bulk_insert(GenreTitle, (
+        GenreTitle(
+            title_id=title_id,
+            genre_id=genre_ids[(index + shift) % len(genre_ids)]
+        )
+        for index, title_id in enumerate(title_ids)
+        for shift in range(GENRES_PER_TITLE)
+    ))
+    bulk_insert(Review, (
+        Review(
+            title_id=title_ids[number % titles],
+            author_id=author_ids[number // titles],
+            text=f'Отзыв {number}',
+            score=number % 10 + 1
+        ) for number in range(reviews)
+    ))
+    review_ids = Review.objects.order_by('id').values_list('id', flat=True)
+    bulk_insert(Comment, (
+        Comment(
+            review_id=review_id,
+            author_id=author_ids[index % len(author_ids)],
+            text=f'Комментарий {index}'
+        ) for index, review_id in enumerate(review_ids[
+            :int(reviews * COMMENTS_PER_REVIEW)
+        ])
+    ))
+    rebuild_title_ratings()
+    rebuild_search_index()
+    rebuild_leaderboards()
+    title_catalog.invalidate()
+    cache.clear()
+
+
+class Benchmark:
+    """Данные и токены, общие для сценариев одного прогона."""
+
+    def __init__(self):
+        self.admin = CustomUser.objects.create(
+            username='bench_admin', email='bench_admin@yamdb.fake',
+            role=ADMIN
+        )
+        self.user = CustomUser.objects.create(
+            username='bench_reader', email='bench_reader@yamdb.fake',
+            role=USER
+        )
+        self.admin_token = str(AccessToken.for_user(self.admin))
+        self.user_token = str(AccessToken.for_user(self.user))
+        self.title = Title.objects.order_by('id').first()
+        self.review = self.title.reviews.order_by('id').first()
+        self.comment = (
+            self.review.comments.order_by('id').first()
+            or Comment.objects.create(
+                review=self.review, author=self.user, text='Комментарий'
+            )
+        )
+        self.category = Category.objects.order_by('id').first()
+        self.genre = Genre.objects.order_by('id').first()
+        self.counter = count()
+        self.title_ids = list(
+            Title.objects.order_by('id').values_list('id', flat=True)
+        )
+
+    def new_title(self):
+        return Title.objects.create(
+            name=f'Новое произведение {next(self.counter)}', year=2000,
+            category=self.category
+        )
+
+    def new_review(self):
+        return Review.objects.create(
+            title=self.new_title(), author=self.user, text='Отзыв', score=5
+        )
+
+    def new_user(self, **fields):
+        number = next(self.counter)
+        return CustomUser.objects.create(
+            username=f'bench_new_{number}',
+            email=f'bench_new_{number}@yamdb.fake', **fields
+        )
+
+    def reviews_url(self, title_id=None):
+        return f'/api/v1/titles/{title_id or self.title.id}/reviews/'
+
+    def review_url(self, review):
+        return f'{self.reviews_url(review.title_id)}{review.id}/'
+
+    def comments_url(self, review=None):
+        return f'{self.review_url(review or self.review)}comments/'
+
+
+def titles_create(bench, index):
+    return '/api/v1/titles/', {
+        'name': f'Создано {index}', 'year': 2001,
+        'category': bench.category.slug, 'genre': [bench.genre.slug]
+    }, bench.admin_token
+
+
+def categories_destroy(bench, index):
+    category = Category.objects.create(
+        name='Удаляемая', slug=f'delete-category-{index}'
+    )
+    return f'/api/v1/categories/{category.slug}/', None, bench.admin_token
+
+
+def genres_destroy(bench, index):
+    genre = Genre.objects.create(
+        name='Удаляемый', slug=f'delete-genre-{index}'
+    )
+    return f'/api/v1/genres/{genre.slug}/', None, bench.admin_token
+
+
+def reviews_create(bench, index):
+    title_id = bench.title_ids[index % len(bench.title_ids)]
+    return bench.reviews_url(title_id), {
+        'text': 'Новый отзыв', 'score': 7
+    }, bench.admin_token
+
+
+def reviews_update(bench, index):
+    return bench.review_url(bench.new_review()), {'score': 3}, (
+        bench.user_token
+    )
+
+
+def reviews_destroy(bench, index):
+    return bench.review_url(bench.new_review()), None, bench.user_token
+
+
+def comments_update(bench, index):
+    review = bench.new_review()
+    comment = Comment.objects.create(
+        review=review, author=bench.user, text='Комментарий'
+    )
+    return f'{bench.comments_url(review)}{comment.id}/', {
+        'text': 'Исправлено'
+    }, bench.user_token
+
+
+def comments_destroy(bench, index):
+    comment = Comment.objects.create(
+        review=bench.review, author=bench.user, text='Комментарий'
+    )
+    return f'{bench.comments_url()}{comment.id}/', None, bench.user_token
+
+
+def users_update(bench, index):
+    return f'/api/v1/users/{bench.new_user().username}/', {
+        'bio': 'Обновлено'
+    }, bench.admin_token
+
+
+def users_destroy(bench, index):
+    return f'/api/v1/users/{bench.new_user().username}/', None, (
+        bench.admin_token
+    )
+
+
+def title_page_urls(bench):
+    return [
+        f'/api/v1/titles/{bench.title.id}/', bench.reviews_url(),
+        bench.comments_url()
+    ]
+
+
+def auth_token(bench, index):
+    user = bench.new_user(confirmation_code='benchcode')
+    return '/api/v1/auth/token/', {
+        'username': user.username, 'confirmation_code': 'benchcode'
+    }, None
+
+
+# Сценарий: имя, метод и функция подготовки запроса (вне замера),
+# которая возвращает путь, тело запроса и токен (None для анонима).
+SCENARIOS = (
+    ('titles-list', 'get', lambda bench, index: (
+        '/api/v1/titles/', None, None)),
+    ('titles-list-filtered', 'get', lambda bench, index: (
+        f'/api/v1/titles/?genre={bench.genre.slug}&year={bench.title.year}',
+        None, None)),
+    ('titles-list-cursor', 'get', lambda bench, index: (
+        '/api/v1/titles/?pagination=cursor', None, None)),
+    ('titles-list-sparse', 'get', lambda bench, index: (
+        '/api/v1/titles/?fields=id,name,rating', None, None)),
+    ('titles-search', 'get', lambda bench, index: (
+        '/api/v1/titles/?search=Произведение', None, None)),
+    ('titles-retrieve', 'get', lambda bench, index: (
+        f'/api/v1/titles/{bench.title.id}/', None, None)),
+    ('titles-score-distribution', 'get', lambda bench, index: (
+        f'/api/v1/titles/{bench.title.id}/score-distribution/', None, None)),
+    ('titles-create', 'post', titles_create),
+    ('titles-partial-update', 'patch', lambda bench, index: (
+        f'/api/v1/titles/{bench.new_title().id}/', {'year': 1999},
+        bench.admin_token)),
+    ('titles-destroy', 'delete', lambda bench, index: (
+        f'/api/v1/titles/{bench.new_title().id}/', None, bench.admin_token)),
+    ('categories-list', 'get', lambda bench, index: (
+        '/api/v1/categories/', None, None)),
+    ('categories-create', 'post', lambda bench, index: (
+        '/api/v1/categories/',
+        {'name': f'Новая {index}', 'slug': f'new-category-{index}'},
+        bench.admin_token)),
+    ('categories-destroy', 'delete', categories_destroy),
+    ('categories-top-rated', 'get', lambda bench, index: (
+        f'/api/v1/categories/{bench.category.slug}/top-rated/', None, None)),
+    ('categories-trending', 'get', lambda bench, index: (
+        f'/api/v1/categories/{bench.category.slug}/trending/', None, None)),
+    ('genres-top-rated', 'get', lambda bench, index: (
+        f'/api/v1/genres/{bench.genre.slug}/top-rated/', None, None)),
+    ('genres-trending', 'get', lambda bench, index: (
+        f'/api/v1/genres/{bench.genre.slug}/trending/', None, None)),
+    ('genres-list', 'get', lambda bench, index: (
+        '/api/v1/genres/', None, None)),
+    ('genres-create', 'post', lambda bench, index: (
+        '/api/v1/genres/',
+        {'name': f'Новый {index}', 'slug': f'new-genre-{index}'},
+        bench.admin_token)),
+    ('genres-destroy', 'delete', genres_destroy),
+    ('reviews-list', 'get', lambda bench, index: (
+        bench.reviews_url(), None, None)),
+    ('reviews-list-sparse', 'get', lambda bench, index: (
+        f'{bench.reviews_url()}?fields=id,score', None, None)),
+    ('reviews-retrieve', 'get', lambda bench, index: (
+        bench.review_url(bench.review), None, None)),
+    ('reviews-create', 'post', reviews_create),
+    ('reviews-partial-update', 'patch', reviews_update),
+    ('reviews-destroy', 'delete', reviews_destroy),
+    ('comments-list', 'get', lambda bench, index: (
+        bench.comments_url(), None, None)),
+    ('comments-retrieve', 'get', lambda bench, index: (
+        f'{bench.comments_url()}{bench.comment.id}/', None, None)),
+    ('comments-create', 'post', lambda bench, index: (
+        bench.comments_url(), {'text': 'Новый комментарий'},
+        bench.user_token)),
+    ('comments-partial-update', 'patch', comments_update),
+    ('comments-destroy', 'delete', comments_destroy),
+    # Страница произведения одним запросом вместо titles-retrieve,
+    # reviews-list и comments-list.
+    ('batch-title-page', 'post', lambda bench, index: (
+        '/api/v1/batch/',
+        {'requests': [{'url': url} for url in title_page_urls(bench)]},
+        None)),
+    ('users-list', 'get', lambda bench, index: (
+        '/api/v1/users/', None, bench.admin_token)),
+    ('users-retrieve', 'get', lambda bench, index: (
+        f'/api/v1/users/{bench.user.username}/', None, bench.admin_token)),
+    ('users-me', 'get', lambda bench, index: (
+        '/api/v1/users/me/', None, bench.user_token)),
+    ('users-create', 'post', lambda bench, index: (
+        '/api/v1/users/', {
+            'username': f'created_{index}',
+            'email': f'created_{index}@yamdb.fake'
+        }, bench.admin_token)),
+    ('users-partial-update', 'patch', users_update),
+    ('users-destroy', 'delete', users_destroy),
+    ('auth-signup', 'post', lambda bench, index: (
+        '/api/v1/auth/signup/', {
+            'username': f'signup_{index}',
+            'email': f'signup_{index}@yamdb.fake'
+        }, None)),
+    ('auth-token', 'post', auth_token),
+    ('cache-stats', 'get', lambda bench, index: (
+        '/api/v1/cache/stats/', None, bench.admin_token)),
+    ('export-titles', 'get', lambda bench, index: (
+        '/api/v1/export/titles/', None, bench.admin_token)),
+)
+
+
+def percentile(values, rank):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(rank / 100 * len(ordered)) - 1)]
+
+
+def summarize(method, path, timings, queries, sizes, statuses):
+    total = sum(timings)
+    summary = {
+        'method': method.upper(),
+        'path': path,
+        'requests': len(timings),
+        'statuses': dict(Counter(statuses)),
+        'mean_ms': round(total / len(timings) * 1000, 3),
+    }
+    for rank in PERCENTILES:
+        summary[f'p{rank}_ms'] = round(percentile(timings, rank) * 1000, 3)
+    summary.update({
+        'throughput_rps': round(len(timings) / total, 2) if total else None,
+        'queries_mean': round(sum(queries) / len(queries), 2),
+        'queries_max': max(queries),
+        'bytes_mean': round(sum(sizes) / len(sizes)),
+    })
+    return summary
+
+
+def run_scenario(client, bench, scenario, iterations, warm_cache=False):
+    name, method, prepare = scenario
+    timings, queries, sizes, statuses = [], [], [], []
+    for index in range(iterations):
+        path, data, token = prepare(bench, index)
+        extra = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        if not warm_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = client.generic(
+                method.upper(), path,
+                json.dumps(data) if data is not None else '',
+                content_type='application/json', **extra
+            )
+            body = (
+                b''.join(response.streaming_content) if response.streaming
+                else response.content
+            )
+            timings.append(time.perf_counter() - started)
+        # Вложенные запросы пакета идут через соединения потоков пула.
+        queries.append(len(context) + sum(
+            getattr(response.wsgi_request, 'subrequest_queries', ())
+        ))
+        sizes.append(len(body))
+        statuses.append(response.status_code)
+    return summarize(method, path, timings, queries, sizes, statuses)
+
+
+def run_benchmark(iterations=20, scenarios=None, warm_cache=False):
+    """
+    Прогоняет сценарии по уже заполненной БД. Ограничение запросов
+    отключено: сценарии повторяют запросы от одного клиента.
+    Кэш ответов включен только с warm_cache.
+    """
+    bench = Benchmark()
+    client = Client()
+    benchmark_settings = override_settings(
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}
+        },
+        RESPONSE_CACHE=warm_cache
+    )
+    with benchmark_settings:
+        return {
+            scenario[0]: run_scenario(
+                client, bench, scenario, iterations, warm_cache
+            )
+            for scenario in SCENARIOS
+            if not scenarios or scenario[0] in scenarios
+        }
+
+
+# Сравнение WSGI и ASGI при высокой конкурентности: синхронные
+# представления DRF в пуле потоков-клиентов против асинхронных
+# /api/v1/async/ в одном цикле событий. Уникальный параметр запроса
+# не дает кэшу ответов подменить работу с БД.
+CONCURRENT_ROUTES = (
+    ('title-detail', lambda bench: f'/api/v1/titles/{bench.title.id}/'),
+    ('reviews-list', lambda bench: bench.reviews_url()),
+    ('comments-list', lambda bench: bench.comments_url()),
+)
+
+
+def get_async_path(path):
+    return path.replace('/api/v1/', '/api/v1/async/', 1)
+
+
+def summarize_load(results, elapsed):
+    timings = [timing for timing, _ in results]
+    summary = {
+        'requests': len(results),
+        'statuses': dict(Counter(status for _, status in results)),
+        'throughput_rps': round(len(results) / elapsed, 2),
+    }
+    for rank in PERCENTILES:
+        summary[f'p{rank}_ms'] = round(percentile(timings, rank) * 1000, 3)
+    return summary
+
+
+def run_wsgi_load(path, concurrency, requests):
+    local = threading.local()
+
+    def fetch(index):
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        started = time.perf_counter()
+        response = local.client.get(path, {'n': index})
+        return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(fetch, range(requests)))
+    return summarize_load(results, time.perf_counter() - started)
+
+
+async def run_asgi_load(path, concurrency, requests):
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(index):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(path, {'n': index})
+            return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(fetch(index) for index in range(
+        requests
+    )))
+    return summarize_load(results, time.perf_counter() - started)
+
+
+def run_concurrency_benchmark(concurrency=64, requests=500):
+    """Пропускная способность и задержки маршрутов под WSGI и ASGI."""
+    bench = Benchmark()
+    report = {}
+    for name, make_path in CONCURRENT_ROUTES:
+        path = make_path(bench)
+        report[name] = {
+            'wsgi': run_wsgi_load(path, concurrency, requests),
+            'asgi': asyncio.run(run_asgi_load(
+                get_async_path(path), concurrency, requests
+            )),
+        }
+    return report
@@ -0,0 +1,92 @@
+import hashlib
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+from api.routers import read_alias
+
+VERSION_KEY = 'yamdb:version:{}'
+RESPONSE_KEY = 'yamdb:response:{}'
+STATS_KEY = 'yamdb:stats:{}'
+STATS = ('hits', 'misses')
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def increment(key):
+    cache = get_cache()
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def bump_versions(resources):
+    """
+    Сбрасывает кэш ответов, зависящих от ресурсов. Версия — новое
+    уникальное значение, а не счетчик: ответ со старой версией не
+    совпадет с новым ключом, даже если версию вытеснили из кэша.
+    """
+    get_cache().set_many({
+        VERSION_KEY.format(resource): new_version()
+        for resource in resources
+    }, timeout=None)
+
+
+def get_versions(keys):
+    """Версии ресурсов; вытесненная или новая версия создается заново."""
+    cache = get_cache()
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = new_version()
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+            versions[key] = version
+    return versions
+
+
+def make_response_key(request, resources):
+    """
+    Ключ ответа: путь, отсортированная строка запроса, тип клиента
+    (аноним или аутентифицированный), БД чтения и версии ресурсов.
+    Ответ реплики не подменяет ответ основной БД после записи.
+    """
+    keys = [VERSION_KEY.format(resource) for resource in resources]
+    versions = get_versions(keys)
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    client = 'auth' if request.user.is_authenticated else 'anon'
+    raw = '|'.join([
+        request.path, query, client, read_alias.get() or 'default',
+        *[f'{key}={versions[key]}' for key in keys]
+    ])
+    return RESPONSE_KEY.format(hashlib.md5(raw.encode()).hexdigest())
+
+
+def get_response(key):
+    data = get_cache().get(key)
+    increment(STATS_KEY.format('misses' if data is None else 'hits'))
+    return data
+
+
+def set_response(key, data):
+    """Ответ живет не дольше TIMEOUT кэша, версии — бессрочно."""
+    get_cache().set(key, data)
+
+
+def get_stats():
+    values = get_cache().get_many([STATS_KEY.format(name) for name in STATS])
+    return {name: values.get(STATS_KEY.format(name), 0) for name in STATS}
+
+
+def clear():
+    get_cache().clear()
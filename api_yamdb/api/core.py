@@ -1,27 +1,99 @@
 import random
 import string
+import time
 
-from django.core.mail import send_mail
-from rest_framework.generics import get_object_or_404
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils.crypto import constant_time_compare, salted_hmac
 
-from users.constants import CONFIRM_CODE_SIZE
+from users.constants import CONFIRM_CODE_SIZE, SIGNED_CODE_SIZE
 from users.models import CustomUser
+from users.outbox import enqueue_email
 
 
-def send_confirmation_code(request):
-    user = get_object_or_404(
-        CustomUser, username=request.data.get('username')
-    )
-    token = random.choices(
+def make_confirmation_code():
+    return ''.join(random.choices(
         string.ascii_letters + string.digits,
         k=CONFIRM_CODE_SIZE
-    )
-    user.confirmation_code = ''.join(token)
-    user.save()
-    send_mail(
+    ))
+
+
+def send_confirmation_code(email, confirmation_code):
+    enqueue_email(
         'Код подтвержения',
-        f'Ваш код {user.confirmation_code} никому не сообщайте.',
-        None,
-        [request.data.get('email')],
-        fail_silently=False,
+        f'Ваш код {confirmation_code} никому не сообщайте.',
+        email
     )
+
+
+def get_code_window(moment=None):
+    ttl = settings.CONFIRMATION_CODE_TTL.total_seconds()
+    return int((time.time() if moment is None else moment) // ttl)
+
+
+def make_signed_code(user_id, nonce, window=None):
+    """
+    Код без хранения: HMAC от id пользователя, его соли (поле
+    confirmation_code) и номера окна времени.
+    """
+    if window is None:
+        window = get_code_window()
+    return salted_hmac(
+        'api.core.make_signed_code', f'{user_id}:{nonce}:{window}',
+        algorithm='sha256'
+    ).hexdigest()[:SIGNED_CODE_SIZE]
+
+
+def check_signed_code(user_id, nonce, code):
+    """Код текущего или предыдущего окна, т.е. живет от TTL до 2·TTL."""
+    window = get_code_window()
+    return any(
+        constant_time_compare(make_signed_code(user_id, nonce, number), code)
+        for number in (window, window - 1)
+    )
+
+
+def issue_confirmation_code(email, username):
+    """
+    Код для пользователя с такими email и username или None, если его
+    нет. Хранимый код перезаписывается одним UPDATE, подписанный
+    вычисляется по одному SELECT без записи.
+    """
+    users = CustomUser.objects.filter(email=email, username=username)
+    if settings.CONFIRMATION_CODE_STATELESS:
+        user = users.values('id', 'confirmation_code').first()
+        if user is None:
+            return None
+        return make_signed_code(user['id'], user['confirmation_code'])
+    confirmation_code = make_confirmation_code()
+    if users.update(confirmation_code=confirmation_code):
+        return confirmation_code
+    return None
+
+
+def get_confirmation_code(user):
+    """Код только что созданного пользователя."""
+    if settings.CONFIRMATION_CODE_STATELESS:
+        return make_signed_code(user.pk, user.confirmation_code)
+    return user.confirmation_code
+
+
+def check_confirmation_code(user, confirmation_code):
+    if settings.CONFIRMATION_CODE_STATELESS:
+        return check_signed_code(
+            user.pk, user.confirmation_code, confirmation_code
+        )
+    return user.confirmation_code == confirmation_code
+
+
+def get_signup_conflict(email, username):
+    """Сообщение об ошибке, если email или username уже заняты."""
+    taken_emails = CustomUser.objects.annotate(
+        email_lower=Lower('email'), username_lower=Lower('username')
+    ).filter(
+        Q(email_lower=email.lower()) | Q(username_lower=username.lower())
+    ).values_list('email_lower', flat=True)
+    if email.lower() in taken_emails:
+        return 'E-mail уже существует'
+    return f'"{username}" уже существует'
@@ -0,0 +1,123 @@
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.models import Comment, GenreTitle, Review, Title
+
+CHUNK_SIZE = 2000
+
+TITLE_FIELDS = (
+    'id', 'name', 'year', 'description', 'category', 'genre',
+    'rating', 'reviews_count'
+)
+REVIEW_FIELDS = (
+    'id', 'title_id', 'title', 'category', 'author', 'text', 'score',
+    'pub_date'
+)
+COMMENT_FIELDS = (
+    'id', 'review_id', 'title_id', 'author', 'text', 'pub_date'
+)
+
+
+def iterate_chunks(queryset):
+    """Читает queryset курсором порциями по CHUNK_SIZE записей."""
+    rows = queryset.iterator(chunk_size=CHUNK_SIZE)
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_genres(title_ids):
+    genres = defaultdict(list)
+    relations = GenreTitle.objects.filter(
+        title_id__in=title_ids
+    ).order_by('genre__slug').values_list('title_id', 'genre__slug')
+    for title_id, slug in relations:
+        genres[title_id].append(slug)
+    return genres
+
+
+def export_titles():
+    queryset = Title.objects.order_by('id').values(
+        'id', 'name', 'year', 'description', 'category__slug',
+        'score_sum', 'reviews_count'
+    )
+    for chunk in iterate_chunks(queryset):
+        genres = get_genres([title['id'] for title in chunk])
+        for title in chunk:
+            count = title['reviews_count']
+            yield {
+                'id': title['id'],
+                'name': title['name'],
+                'year': title['year'],
+                'description': title['description'],
+                'category': title['category__slug'],
+                'genre': genres.get(title['id'], []),
+                'rating': title['score_sum'] / count if count else None,
+                'reviews_count': count,
+            }
+
+
+def export_reviews():
+    queryset = Review.objects.order_by('id').values_list(
+        'id', 'title_id', 'title__name', 'title__category__slug',
+        'author__username', 'text', 'score', 'pub_date'
+    )
+    for row in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield dict(zip(REVIEW_FIELDS, row))
+
+
+def export_comments():
+    queryset = Comment.objects.order_by('id').values_list(
+        'id', 'review_id', 'review__title_id', 'author__username', 'text',
+        'pub_date'
+    )
+    for row in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield dict(zip(COMMENT_FIELDS, row))
+
+
+EXPORTS = {
+    'titles': (export_titles, TITLE_FIELDS),
+    'reviews': (export_reviews, REVIEW_FIELDS),
+    'comments': (export_comments, COMMENT_FIELDS),
+}
+
+
+class Echo:
+    """Буфер для csv.writer, который сразу возвращает строку."""
+
+    def write(self, value):
+        return value
+
+
+def to_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def to_csv(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        if isinstance(row.get('genre'), list):
+            row['genre'] = ','.join(row['genre'])
+        yield writer.writerow([row[field] for field in fields])
+
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def stream_export(resource, output):
+    """Генератор строк выгрузки ресурса в формате ndjson или csv."""
+    export, fields = EXPORTS[resource]
+    if output == 'csv':
+        return to_csv(export(), fields)
+    return to_ndjson(export())
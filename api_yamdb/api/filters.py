@@ -1,22 +1,25 @@
 import django_filters
+from django.db.models import Q
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
 
-from reviews.models import Title
+from reviews.catalog import split_slugs
+from reviews.models import Genre, GenreTitle, Title
+from reviews.search import build_match_query, search_supported
 
 
 class TitleFilter(django_filters.FilterSet):
     """
     Кастомный фильтр для вывода произведений.
-    Поиск жанра по слагу.
+    Поиск жанра по слагу: `genre=drama,comedy` — любой из жанров,
+    `genre_all=drama,comedy` — все жанры сразу.
     """
     year = django_filters.NumberFilter(field_name='year')
     category = django_filters.CharFilter(
         field_name='category__slug',
         lookup_expr='icontains'
     )
-    genre = django_filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
-    )
+    genre = django_filters.CharFilter(method='filter_genre')
+    genre_all = django_filters.CharFilter(method='filter_genre_all')
     name = django_filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
@@ -24,4 +27,62 @@ class TitleFilter(django_filters.FilterSet):
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = ('category', 'genre', 'genre_all', 'name', 'year')
+
+    @staticmethod
+    def get_title_ids(genres):
+        """Произведения жанров: поиск по индексу (genre, title)."""
+        return GenreTitle.objects.filter(
+            genre__in=Genre.objects.filter(genres).values('id')
+        ).values('title_id')
+
+    def filter_genre(self, queryset, name, value):
+        genres = Q()
+        for slug in split_slugs(value):
+            genres |= Q(slug__icontains=slug)
+        return queryset.filter(id__in=self.get_title_ids(genres))
+
+    def filter_genre_all(self, queryset, name, value):
+        for slug in split_slugs(value):
+            queryset = queryset.filter(
+                id__in=self.get_title_ids(Q(slug__icontains=slug))
+            )
+        return queryset
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск `?search=` по названию и описанию.
+    Результаты упорядочены по релевантности (bm25).
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        match_query = build_match_query(text)
+        if not match_query:
+            return queryset
+        if not search_supported():
+            return queryset.filter(
+                Q(name__icontains=text) | Q(description__icontains=text)
+            )
+        return queryset.filter(
+            search_index__document__match=match_query
+        ).order_by('search_index__rank', 'name', 'id')
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """
+    Сортировка `?ordering=name,-year` по полям `ordering_fields`
+    представления. Последним добавляется id в направлении последнего
+    поля, чтобы порядок был однозначным и читался одним индексом.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        fields = [field.lstrip('-') for field in ordering]
+        if 'id' in fields:
+            return ordering[:fields.index('id') + 1]
+        return [*ordering, '-id' if ordering[-1].startswith('-') else 'id']
@@ -0,0 +1,70 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api.benchmark import (
+    SCENARIOS, run_benchmark, seed_dataset, test_database
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержки всех маршрутов API на синтетических данных '
+        'во временной тестовой БД и сохраняет результат в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reviews', type=int, nargs='+', default=[1000],
+            help='Размеры наборов данных (количество отзывов).'
+        )
+        parser.add_argument(
+            '--iterations', type=int, default=20,
+            help='Количество запросов на каждый сценарий.'
+        )
+        parser.add_argument(
+            '--scenario', action='append',
+            choices=[scenario[0] for scenario in SCENARIOS],
+            help='Запустить только указанные сценарии.'
+        )
+        parser.add_argument(
+            '--warm-cache', action='store_true',
+            help='Не очищать кэш ответов перед каждым запросом.'
+        )
+        parser.add_argument(
+            '--output', help='Файл для результатов (по умолчанию stdout).'
+        )
+
+    def handle(self, *args, **options):
+        report = {
+            'iterations': options['iterations'],
+            'warm_cache': options['warm_cache'],
+            'vendor': connection.vendor,
+            'datasets': {},
+        }
+        for reviews in options['reviews']:
+            report['datasets'][str(reviews)] = self.run(reviews, options)
+        result = json.dumps(report, ensure_ascii=False, indent=2)
+        if not options['output']:
+            self.stdout.write(result)
+            return
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            file.write(result)
+        self.stdout.write(
+            self.style.SUCCESS(f'Результаты сохранены в {options["output"]}')
+        )
+
+    def run(self, reviews, options):
+        with test_database():
+            started = time.monotonic()
+            seed_dataset(reviews)
+            self.stderr.write(
+                f'{reviews} отзывов создано за '
+                f'{time.monotonic() - started:.1f} с'
+            )
+            return run_benchmark(
+                options['iterations'], options['scenario'],
+                options['warm_cache']
+            )
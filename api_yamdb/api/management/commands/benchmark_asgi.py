@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.benchmark import (
+    run_concurrency_benchmark, seed_dataset, test_database
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность чтения произведений, отзывов '
+        'и комментариев под WSGI и ASGI при высокой конкурентности.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reviews', type=int, default=1000,
+            help='Размер набора данных (количество отзывов).'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=64,
+            help='Одновременных запросов.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=500,
+            help='Запросов на каждый маршрут и режим.'
+        )
+
+    def handle(self, *args, **options):
+        with test_database():
+            seed_dataset(options['reviews'])
+            report = run_concurrency_benchmark(
+                options['concurrency'], options['requests']
+            )
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.sqlite import run_sqlite_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность чтения и записи SQLite при '
+        'одновременной нагрузке без настройки и с SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seconds', type=float, default=5,
+            help='Длительность нагрузки для каждого режима.'
+        )
+        parser.add_argument(
+            '--readers', type=int, default=4, help='Потоков чтения.'
+        )
+        parser.add_argument(
+            '--writers', type=int, default=2, help='Потоков записи.'
+        )
+        parser.add_argument(
+            '--reviews', type=int, default=10000,
+            help='Отзывов в тестовой БД.'
+        )
+
+    def handle(self, *args, **options):
+        report = run_sqlite_benchmark(
+            options['seconds'],
+            options['readers'],
+            options['writers'],
+            reviews=options['reviews']
+        )
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
@@ -0,0 +1,248 @@
+import csv
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api import cache
+from reviews.catalog import title_catalog
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.ratings import rebuild_title_ratings
+from reviews.search import rebuild_search_index
+from users.models import CustomUser
+
+# Файл, модель и соответствие столбцов CSV полям модели,
+# в порядке зависимостей по внешним ключам.
+DATASETS = {
+    'users.csv': (CustomUser, {}),
+    'category.csv': (Category, {}),
+    'genre.csv': (Genre, {}),
+    'titles.csv': (Title, {'category': 'category'}),
+    'genre_title.csv': (
+        GenreTitle, {'title_id': 'title', 'genre_id': 'genre'}
+    ),
+    'review.csv': (Review, {'title_id': 'title', 'author': 'author'}),
+    'comments.csv': (Comment, {'review_id': 'review', 'author': 'author'}),
+}
+FK_LOOKUP_BATCH = 900
+CHECKPOINT_NAME = '.import_checkpoint.json'
+
+
+class ImportRowError(Exception):
+    pass
+
+
+def parse_chunk(filename, start, rows):
+    """
+    Преобразует и проверяет записи CSV. Выполняется в том числе
+    в дочерних процессах, поэтому не обращается к БД.
+    """
+    model, columns = DATASETS[filename]
+    parsed = []
+    for number, row in enumerate(rows, start):
+        values = {}
+        try:
+            for column, raw in row.items():
+                if column is None:
+                    raise ValueError('лишние значения в записи')
+                field = model._meta.get_field(columns.get(column, column))
+                if field.is_relation:
+                    values[field.attname] = int(raw) if raw else None
+                    continue
+                value = field.to_python(raw)
+                if value in field.empty_values and field.blank:
+                    value = field.get_default()
+                field.validate(value, None)
+                field.run_validators(value)
+                values[field.attname] = value
+        except (ValidationError, ValueError) as error:
+            raise ImportRowError(
+                f'{filename}: запись {number}, поле {column}: {error}'
+            )
+        parsed.append(values)
+    return parsed
+
+
+def read_chunks(path, chunk_size, skip):
+    """Потоково читает CSV и отдает записи порциями."""
+    with open(path, encoding='utf-8', newline='') as csv_file:
+        reader = csv.DictReader(csv_file)
+        rows = islice(reader, skip, None)
+        start = skip + 1
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield start, chunk
+            start += len(chunk)
+
+
+@contextmanager
+def keep_timestamps(model):
+    """Отключает auto_now(_add), чтобы сохранить даты из файла."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает данные из CSV (static/data) пакетами bulk_create '
+        'с проверкой внешних ключей и возможностью продолжить загрузку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=str(settings.BASE_DIR / 'static' / 'data'),
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Количество записей в одной транзакции.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help='Число процессов для разбора и проверки порций.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с позицией загрузки (по умолчанию в каталоге CSV).'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить с последней зафиксированной порции.'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        self.checkpoint_path = Path(
+            options['checkpoint'] or path / CHECKPOINT_NAME
+        )
+        self.checkpoint = {}
+        if options['resume'] and self.checkpoint_path.exists():
+            self.checkpoint = json.loads(self.checkpoint_path.read_text())
+        for filename in DATASETS:
+            if (path / filename).exists():
+                self.import_file(path / filename, options)
+        self.finish()
+        self.checkpoint_path.unlink(missing_ok=True)
+
+    def import_file(self, path, options):
+        filename = path.name
+        model, _ = DATASETS[filename]
+        skip = self.checkpoint.get(filename, 0)
+        chunks = read_chunks(path, options['chunk_size'], skip)
+        started = time.monotonic()
+        total = skip
+        replay = bool(skip)
+        with keep_timestamps(model):
+            for rows in self.parse(filename, chunks, options['workers']):
+                objects = self.build_objects(model, rows)
+                with transaction.atomic():
+                    self.check_foreign_keys(filename, model, rows)
+                    model.objects.bulk_create(
+                        objects, ignore_conflicts=replay
+                    )
+                total += len(objects)
+                replay = False
+                self.save_checkpoint(filename, total)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{filename}: {total} записей, '
+                    f'{(total - skip) / max(elapsed, 1e-6):.0f} записей/с'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'{filename}: загружено {total - skip} записей'
+        ))
+
+    def parse(self, filename, chunks, workers):
+        try:
+            if not workers:
+                for start, rows in chunks:
+                    yield parse_chunk(filename, start, rows)
+                return
+            pool = ProcessPoolExecutor(workers, initializer=django.setup)
+            with pool:
+                pending = deque()
+                for start, rows in chunks:
+                    pending.append(
+                        pool.submit(parse_chunk, filename, start, rows)
+                    )
+                    if len(pending) >= workers * 2:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+        except ImportRowError as error:
+            raise CommandError(error)
+
+    def build_objects(self, model, rows):
+        now = timezone.now()
+        has_modified = any(
+            field.name == 'modified' for field in model._meta.concrete_fields
+        )
+        objects = []
+        for values in rows:
+            if model is CustomUser:
+                values.setdefault('password', make_password(None))
+            if has_modified and 'modified' not in values:
+                values['modified'] = values.get('pub_date', now)
+            objects.append(model(**values))
+        return objects
+
+    def check_foreign_keys(self, filename, model, rows):
+        """Проверяет ссылки порции одним запросом на каждые 900 id."""
+        for field in model._meta.concrete_fields:
+            if not field.is_relation:
+                continue
+            ids = {row[field.attname] for row in rows} - {None}
+            found = set()
+            ids_list = list(ids)
+            for index in range(0, len(ids_list), FK_LOOKUP_BATCH):
+                found.update(field.related_model.objects.filter(
+                    pk__in=ids_list[index:index + FK_LOOKUP_BATCH]
+                ).values_list('pk', flat=True))
+            missing = ids - found
+            if missing:
+                raise CommandError(
+                    f'{filename}: {field.name} ссылается на '
+                    f'несуществующие id {sorted(missing)[:10]}'
+                )
+
+    def save_checkpoint(self, filename, total):
+        self.checkpoint[filename] = total
+        self.checkpoint_path.write_text(json.dumps(self.checkpoint))
+
+    def finish(self):
+        """Пересчитывает то, что bulk_create обходит вместе с сигналами."""
+        models = [model for model, _ in DATASETS.values()]
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+        rebuild_title_ratings()
+        rebuild_search_index()
+        rebuild_leaderboards()
+        title_catalog.invalidate()
+        cache.clear()
@@ -0,0 +1,110 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from rest_framework.permissions import SAFE_METHODS
+
+from api.routers import get_read_alias, read_alias, stick_to_primary
+
+logger = logging.getLogger('api.query_budget')
+
+
+def get_query_budget(view_class, action):
+    """
+    Допустимое число SQL-запросов для действия представления.
+    Бюджет задается атрибутом query_budget: ключи — действия
+    вьюсета (list, retrieve, ...) или HTTP-методы для APIView.
+    """
+    return getattr(view_class, 'query_budget', {}).get(action)
+
+
+def resolve_action(view_func, method):
+    actions = getattr(view_func, 'actions', None) or {}
+    return actions.get(method.lower(), method.lower())
+
+
+class QueryBudgetMiddleware:
+    """
+    В режиме DEBUG пишет в лог запросы, превысившие бюджет SQL-запросов
+    представления. Вне DEBUG не подключается.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = len(connection.queries)
+        response = self.get_response(request)
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None:
+            used = len(connection.queries) - start
+            if used > budget:
+                logger.warning(
+                    'Превышен бюджет SQL-запросов: %s %s (%s) — %s из %s',
+                    request.method, request.path, request.query_action,
+                    used, budget
+                )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if view_class is None:
+            return None
+        request.query_action = resolve_action(view_func, request.method)
+        request.query_budget = get_query_budget(
+            view_class, request.query_action
+        )
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Безопасные запросы к представлениям с `read_from_replica` читают
+    из реплики DATABASE_REPLICAS. После успешной записи клиент читает
+    из основной БД, пока не истечет REPLICA_STICKY_SECONDS.
+    Работает и под ASGI без переключения в синхронный режим.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_alias.set(None)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_alias.set(None)
+        return self.process_response(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        alias = get_read_alias(request, getattr(view_func, 'cls', view_func))
+        if alias is not None:
+            read_alias.set(alias)
+        return None
+
+    def process_response(self, request, response):
+        if (request.method not in SAFE_METHODS
+                and response.status_code < 400):
+            stick_to_primary(request)
+        return response
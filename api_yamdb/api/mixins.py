@@ -1,11 +1,243 @@
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import response, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.mixins import (
     ListModelMixin, CreateModelMixin, DestroyModelMixin
 )
 from rest_framework.viewsets import GenericViewSet
 
+from api import cache
+from api.serializers import TitleSerializer
+from reviews import leaderboards
+
 
 class ListCreateDestroyMixin(ListModelMixin,
                              CreateModelMixin,
                              DestroyModelMixin,
                              GenericViewSet):
     """Набор миксинов для жанров и категорий."""
+
+
+class CachedListMixin:
+    """
+    Кэширует ответы списка на GET-запросы. Ключ включает версии
+    ресурсов `cache_dependencies`, которые увеличиваются сигналами
+    моделей при записи; TTL ответа — страховка от потерянного сброса.
+    Работает только при включенном RESPONSE_CACHE.
+    """
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE:
+            return super().list(request, *args, **kwargs)
+        key = cache.make_response_key(request, self.cache_dependencies)
+        data = cache.get_response(key)
+        if data is not None:
+            return response.Response(data)
+        result = super().list(request, *args, **kwargs)
+        if result.status_code == status.HTTP_200_OK:
+            cache.set_response(key, result.data)
+        return result
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы: ответ 304 на If-None-Match / If-Modified-Since
+    без сериализации. Валидаторы — максимальная дата изменения и число
+    строк набора — считаются одним агрегирующим запросом по индексу.
+    """
+    modified_field = 'modified'
+
+    def get_validators(self, queryset):
+        values = queryset.order_by().aggregate(
+            last_modified=Max(self.modified_field), count=Count('pk')
+        )
+        return values['last_modified'], values['count']
+
+    def get_etag(self, request, last_modified, count):
+        stamp = last_modified.isoformat() if last_modified else ''
+        raw = f'{request.get_full_path()}|{stamp}|{count}'
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+    def conditional_response(self, request, queryset, handler, *args,
+                             **kwargs):
+        last_modified, count = self.get_validators(queryset)
+        etag = self.get_etag(request, last_modified, count)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+        result = handler(request, *args, **kwargs)
+        if result.status_code == status.HTTP_200_OK:
+            result['ETag'] = etag
+            if timestamp is not None:
+                result['Last-Modified'] = http_date(timestamp)
+        return result
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, self.get_queryset(), super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        # Некорректный id — 404, как в generics.get_object_or_404.
+        try:
+            queryset = self.get_queryset().filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, DjangoValidationError):
+            raise Http404
+        return self.conditional_response(
+            request, queryset, super().retrieve, *args, **kwargs
+        )
+
+
+class LeaderboardMixin:
+    """
+    Рейтинги произведений категории или жанра: `top-rated` и `trending`.
+    Читаются из материализованной таблицы `leaderboard_model` по индексу.
+    """
+    leaderboard_model = None
+
+    def get_leaderboard_response(self, entries):
+        page = self.paginate_queryset(
+            entries.select_related('title__category').prefetch_related(
+                'title__genre'
+            )
+        )
+        serializer = TitleSerializer(
+            [entry.title for entry in page], many=True
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, url_path='top-rated')
+    def top_rated(self, request, *args, **kwargs):
+        min_reviews = request.query_params.get(
+            'min_reviews', leaderboards.DEFAULT_MIN_REVIEWS
+        )
+        try:
+            min_reviews = int(min_reviews)
+        except ValueError:
+            raise ValidationError(
+                {'min_reviews': 'Укажите целое число отзывов.'}
+            )
+        return self.get_leaderboard_response(leaderboards.top_rated(
+            self.leaderboard_model, self.get_object().pk, min_reviews
+        ))
+
+    @action(detail=True)
+    def trending(self, request, *args, **kwargs):
+        return self.get_leaderboard_response(leaderboards.trending(
+            self.leaderboard_model, self.get_object().pk
+        ))
+
+
+class SparseFieldsMixin:
+    """
+    Параметр `?fields=id,name` для чтения: сериализатор выводит только
+    перечисленные поля, а набор загружает только их столбцы.
+    `sparse_columns`: поле -> столбцы модели (связи через __ загружаются
+    select_related), `sparse_prefetch`: поле -> prefetch_related.
+    Без параметра ответ и набор не меняются.
+    """
+    sparse_columns = {}
+    sparse_prefetch = {}
+
+    def get_sparse_fields(self):
+        if self.request is None or self.request.method != 'GET':
+            return None
+        fields = {
+            name.strip()
+            for name in self.request.query_params.get('fields', '').split(',')
+            if name.strip()
+        }
+        if not fields:
+            return None
+        unknown = fields - set(self.sparse_columns)
+        if unknown:
+            raise ValidationError({
+                'fields': f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+            })
+        return fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        # Столбцы сортировки нужны курсору.
+        columns = {'pk', *[
+            column.lstrip('-')
+            for column in getattr(self, 'cursor_ordering', ())
+        ]}
+        for name in fields:
+            columns.update(self.sparse_columns[name])
+        queryset = queryset.select_related(None).prefetch_related(None)
+        related = {
+            column.rsplit('__', 1)[0] for column in columns if '__' in column
+        }
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.prefetch_related(*[
+            self.sparse_prefetch[name]
+            for name in fields if name in self.sparse_prefetch
+        ]).only(*columns)
+
+
+class NestedResourceMixin:
+    """
+    Вложенные маршруты. Родитель `parent_model` ищется одним запросом
+    по всей цепочке идентификаторов из URL (`parent_lookups`: поле
+    модели -> аргумент URL) и кэшируется в запросе для списка
+    и создания объектов; отдельный объект выбирается одним запросом
+    вместе с проверкой цепочки. Несовпадающая цепочка дает 404.
+    """
+    parent_model = None
+    parent_field = None
+    parent_lookups = {}
+
+    def get_parent(self):
+        lookups = {
+            field: self.kwargs.get(kwarg)
+            for field, kwarg in self.parent_lookups.items()
+        }
+        parents = getattr(self.request, 'nested_parents', None)
+        if parents is None:
+            parents = self.request.nested_parents = {}
+        key = (self.parent_model, tuple(sorted(lookups.items())))
+        if key not in parents:
+            parents[key] = get_object_or_404(self.parent_model, **lookups)
+        return parents[key]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, 'detail', False):
+            # Объект ищется вместе с цепочкой, родитель не нужен.
+            return queryset.filter(**{
+                f'{self.parent_field}__{field}': self.kwargs.get(kwarg)
+                for field, kwarg in self.parent_lookups.items()
+            })
+        return queryset.filter(**{self.parent_field: self.get_parent()})
+
+    def perform_create(self, serializer):
+        serializer.save(
+            author=self.request.user, **{self.parent_field: self.get_parent()}
+        )
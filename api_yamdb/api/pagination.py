@@ -0,0 +1,163 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (keyset) с непрозрачным курсором.
+    Порядок задается атрибутом `cursor_ordering` у представления,
+    последнее поле должно быть уникальным, например `id`.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = api_settings.PAGE_SIZE
+    max_limit = 100
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.fields = [
+            (field.lstrip('-'), field.startswith('-'))
+            for field in view.cursor_ordering
+        ]
+        model = queryset.model
+        position, reverse = self.decode_cursor(request, model)
+
+        fields = self.fields
+        if reverse:
+            fields = [(name, not desc) for name, desc in fields]
+        queryset = queryset.order_by(
+            *[f'-{name}' if desc else name for name, desc in fields]
+        )
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(
+                fields, position
+            ))
+
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = results
+        self.model = model
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        if limit <= 0:
+            return self.default_limit
+        return min(limit, self.max_limit)
+
+    def get_keyset_filter(self, fields, position):
+        """Строит условие «строго после позиции» для составного ключа."""
+        keyset = Q()
+        for index, (name, desc) in enumerate(fields):
+            condition = Q(**{
+                f'{name}__lt' if desc else f'{name}__gt': position[index]
+            })
+            for (prev_name, _), value in zip(fields[:index], position):
+                condition &= Q(**{prev_name: value})
+            keyset |= condition
+        return keyset
+
+    def get_position(self, obj):
+        return [
+            self.model._meta.get_field(name).value_to_string(obj)
+            for name, _ in self.fields
+        ]
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii'))
+            )
+            if len(payload['p']) != len(self.fields):
+                raise ValueError(self.invalid_cursor_message)
+            position = [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, payload['p'])
+            ]
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError,
+                binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, obj, reverse=False):
+        payload = {'p': self.get_position(obj)}
+        if reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload).encode('utf-8')
+        ).decode('ascii')
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, LimitOffsetPagination.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class OffsetOrCursorPagination(LimitOffsetPagination):
+    """
+    Пагинация по смещению, как и раньше, с режимом курсора по запросу.
+    Курсорный режим включается параметром `?pagination=cursor`
+    (или наличием `cursor`) для представлений с `cursor_ordering`.
+    """
+    mode_query_param = 'pagination'
+    cursor_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.is_cursor_mode(request, view):
+            self.cursor_paginator = self.cursor_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def is_cursor_mode(self, request, view):
+        if not getattr(view, 'cursor_ordering', None):
+            return False
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_class.cursor_query_param in request.query_params
+        )
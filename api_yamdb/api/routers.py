@@ -0,0 +1,106 @@
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import DEFAULT_DB_ALIAS, close_old_connections
+from rest_framework.permissions import SAFE_METHODS
+
+STICKY_KEY = 'yamdb:sticky:{}'
+
+# Реплика для чтения в текущем запросе; None — основная БД.
+read_alias = ContextVar('read_alias', default=None)
+
+
+def get_client_key(request):
+    """Клиент — по заголовку авторизации, аноним — по IP."""
+    ident = request.META.get('HTTP_AUTHORIZATION') or (
+        request.META.get('REMOTE_ADDR', '')
+    )
+    return STICKY_KEY.format(hashlib.md5(ident.encode()).hexdigest())
+
+
+class StickyFileBasedCache(FileBasedCache):
+    """
+    Файловый кэш отметок о записи. При MAX_ENTRIES записей сначала
+    удаляет истекшие отметки и только если их не хватило — случайную
+    часть живых, как FileBasedCache.
+    """
+
+    def _cull(self):
+        filelist = self._list_cache_files()
+        if len(filelist) < self._max_entries:
+            return
+        for fname in filelist:
+            try:
+                with open(fname, 'rb') as f:
+                    self._is_expired(f)
+            except FileNotFoundError:
+                pass
+        super()._cull()
+
+
+def get_sticky_cache():
+    """Отметки должны быть общими для процессов, обслуживающих клиента."""
+    return caches[settings.REPLICA_STICKY_CACHE_ALIAS]
+
+
+def stick_to_primary(request):
+    """После записи клиент читает из основной БД REPLICA_STICKY_SECONDS."""
+    get_sticky_cache().set(
+        get_client_key(request), True, settings.REPLICA_STICKY_SECONDS
+    )
+
+
+def is_sticky(request):
+    return get_sticky_cache().get(get_client_key(request), False)
+
+
+def choose_replica():
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def get_read_alias(request, view):
+    """
+    Реплика для безопасного запроса к представлению с
+    `read_from_replica`; None — читать из основной БД.
+    """
+    if (settings.DATABASE_REPLICAS
+            and request.method in SAFE_METHODS
+            and getattr(view, 'read_from_replica', False)
+            and not is_sticky(request)):
+        return choose_replica()
+    return None
+
+
+def call_db(func, *args):
+    """
+    Вызов в потоке пула: соединения потока живут по CONN_MAX_AGE,
+    как у запросов.
+    """
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+class ReplicaRouter:
+    """
+    Чтение в запросах, которые ReplicaMiddleware отправил на реплику,
+    идет в `read_alias`, остальное чтение и любая запись — в основную БД.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= aliases:
+            return True
+        return None
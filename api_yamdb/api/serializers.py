@@ -1,8 +1,12 @@
+from urllib.parse import urlsplit
+
+from django.conf import settings
 from django.core.validators import RegexValidator
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import serializers, status, response, validators
 
+from api.core import check_confirmation_code
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.constants import (
     FIELD_DEFAULT_LEN, PROHIBITED_USERNAMES, USERNAME_REGEX
@@ -10,7 +14,29 @@ from users.constants import (
 from users.models import CustomUser
 
 
-class CustomUserSerializer(serializers.ModelSerializer):
+def get_title_rating(title):
+    """Целая средняя оценка или None, если отзывов нет."""
+    if not title.reviews_count:
+        return None
+    return int(title.rating)
+
+
+class SparseFieldsSerializerMixin:
+    """Оставляет только поля `fields` из контекста (параметр ?fields=)."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        if requested is None:
+            return fields
+        return {
+            name: field for name, field in fields.items()
+            if name in requested
+        }
+
+
+class CustomUserSerializer(SparseFieldsSerializerMixin,
+                           serializers.ModelSerializer):
     username = serializers.CharField(
         max_length=FIELD_DEFAULT_LEN,
         validators=[
@@ -18,7 +44,9 @@ class CustomUserSerializer(serializers.ModelSerializer):
                 regex=USERNAME_REGEX,
                 message='Доступны только буквы, цифры и нижнее подчеркивания'
             ),
-            validators.UniqueValidator(queryset=CustomUser.objects.all())
+            validators.UniqueValidator(
+                queryset=CustomUser.objects.all(), lookup='iexact'
+            )
         ]
     )
 
@@ -27,6 +55,11 @@ class CustomUserSerializer(serializers.ModelSerializer):
         fields = (
             'first_name', 'last_name', 'email', 'username', 'role', 'bio'
         )
+        extra_kwargs = {
+            'email': {'validators': [validators.UniqueValidator(
+                queryset=CustomUser.objects.all(), lookup='iexact'
+            )]},
+        }
 
 
 class TokenSerializer(serializers.Serializer):
@@ -48,21 +81,30 @@ class TokenSerializer(serializers.Serializer):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        if user.confirmation_code != confirmation_code:
+        if not check_confirmation_code(user, confirmation_code):
             raise serializers.ValidationError(
                 'Недействительный код подтверждения'
             )
 
+        attrs['user'] = user
         return attrs
 
 
 class SignupSerializer(serializers.ModelSerializer):
+    """
+    Проверяет данные регистрации без запросов к базе: занятые email
+    и username отлавливает уникальный индекс при вставке.
+    """
+
     class Meta:
         model = CustomUser
         fields = ('email', 'username')
+        extra_kwargs = {
+            'email': {'validators': []},
+            'username': {'validators': [CustomUser.username_validator]},
+        }
 
     def validate(self, attrs):
-        email = attrs.get('email')
         username = attrs.get('username')
 
         if username.lower() in PROHIBITED_USERNAMES:
@@ -70,13 +112,29 @@ class SignupSerializer(serializers.ModelSerializer):
                 f'"{username}" нельзя использовать'
             )
 
-        if CustomUser.objects.filter(email__iexact=email).exists():
-            raise serializers.ValidationError('E-mail уже существует')
+        return attrs
 
-        if CustomUser.objects.filter(username__iexact=username).exists():
-            raise serializers.ValidationError(f'"{username}" уже существует')
 
-        return attrs
+class BatchItemSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=('GET',), default='GET')
+    url = serializers.CharField()
+
+    def validate_url(self, value):
+        parts = urlsplit(value)
+        if parts.scheme or parts.netloc or not parts.path.startswith('/'):
+            raise serializers.ValidationError(
+                'Укажите путь от корня сайта, например /api/v1/titles/.'
+            )
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    """Пакет GET-запросов, не больше BATCH_MAX_REQUESTS."""
+    requests = serializers.ListField(
+        child=BatchItemSerializer(),
+        allow_empty=False,
+        max_length=settings.BATCH_MAX_REQUESTS
+    )
 
 
 class CustomUserMeSerializer(CustomUserSerializer):
@@ -99,12 +157,13 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug',)
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
     """Сериалайзер для получения произведений."""
 
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
-    rating = serializers.IntegerField(read_only=True)
+    rating = serializers.SerializerMethodField()
 
     class Meta:
         model = Title
@@ -112,6 +171,9 @@ class TitleSerializer(serializers.ModelSerializer):
                   'description', 'genre', 'category')
         read_only_fields = ('id', 'rating',)
 
+    def get_rating(self, obj):
+        return get_title_rating(obj)
+
 
 class TitleCreateSerializer(serializers.ModelSerializer):
     """Сериалайзер для создания произведений."""
@@ -151,7 +213,26 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         return value
 
 
-class ReviewsSerializer(serializers.ModelSerializer):
+class ScoreDistributionSerializer(serializers.ModelSerializer):
+    """Сериалайзер распределения оценок произведения."""
+
+    rating = serializers.SerializerMethodField()
+    distribution = serializers.DictField(
+        source='score_distribution',
+        child=serializers.IntegerField(),
+        read_only=True
+    )
+
+    class Meta:
+        model = Title
+        fields = ('id', 'rating', 'reviews_count', 'distribution')
+
+    def get_rating(self, obj):
+        return get_title_rating(obj)
+
+
+class ReviewsSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериалайзер для отзывов."""
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
@@ -189,7 +270,8 @@ class ReviewsSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentsSerializer(serializers.ModelSerializer):
+class CommentsSerializer(SparseFieldsSerializerMixin,
+                         serializers.ModelSerializer):
     """Сериалайзер для комментариев."""
     author = serializers.SlugRelatedField(read_only=True,
                                           slug_field='username')
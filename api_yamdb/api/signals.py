@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_migrate, post_save
+)
+from django.dispatch import receiver
+
+from api import cache
+from api.authentication import user_cache
+from api.sqlite import apply_pragmas, get_pragmas
+from api.throttling import get_store
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from users.models import CustomUser
+
+CACHE_RESOURCES = {
+    Category: 'categories',
+    CustomUser: 'users',
+    Genre: 'genres',
+    GenreTitle: 'titles',
+    Review: 'reviews',
+    Title: 'titles',
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(m2m_changed)
+def bump_cache_version(sender, **kwargs):
+    """
+    Запись ресурса (через представления, админку или каскадом)
+    увеличивает его версию после фиксации транзакции.
+    """
+    resource = CACHE_RESOURCES.get(sender)
+    if resource:
+        transaction.on_commit(lambda: cache.bump_versions((resource,)))
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    """Сбрасывает снимок сразу и после фиксации транзакции."""
+    user_cache.invalidate(instance.pk)
+    transaction.on_commit(lambda: user_cache.invalidate(instance.pk))
+
+
+@receiver(post_migrate)
+def clear_response_cache(sender, **kwargs):
+    """После миграций и очистки БД кэши процесса неактуальны."""
+    cache.clear()
+    user_cache.clear()
+    get_store().clear()
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """PRAGMA из настроек; напрямую, чтобы не считаться SQL-запросами."""
+    if connection.vendor == 'sqlite':
+        apply_pragmas(connection.connection, get_pragmas())
@@ -0,0 +1,153 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+# Ожидание блокировки (с) у соединений sqlite3 по умолчанию, как в Django.
+DEFAULT_TIMEOUT = 5
+PAGE_SIZE = 10
+
+
+def get_pragmas():
+    """PRAGMA для новых соединений; пусто, если SQLITE_TUNING выключен."""
+    if not settings.SQLITE_TUNING:
+        return {}
+    return settings.SQLITE_PRAGMAS
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """Применяет PRAGMA к DB-API соединению sqlite3."""
+    for name, value in pragmas.items():
+        dbapi_connection.execute(f'PRAGMA {name} = {value}')
+
+
+# Смешанная нагрузка: читатели листают отзывы произведений, писатели
+# добавляют отзыв и обновляют агрегаты произведения в транзакции,
+# как при POST /reviews/. Для каждого режима создается свой файл БД:
+# journal_mode=WAL сохраняется в файле.
+
+SCHEMA = (
+    'CREATE TABLE title (id INTEGER PRIMARY KEY, name TEXT, '
+    'score_sum INTEGER, reviews_count INTEGER)',
+    'CREATE TABLE review (id INTEGER PRIMARY KEY, title_id INTEGER, '
+    'score INTEGER, text TEXT, pub_date REAL)',
+    'CREATE INDEX review_title_pub_date ON review (title_id, pub_date, id)',
+)
+
+
+def create_load_db(path, titles, reviews):
+    with sqlite3.connect(path) as db:
+        for statement in SCHEMA:
+            db.execute(statement)
+        db.executemany(
+            'INSERT INTO title VALUES (?, ?, 0, 0)',
+            ((number, f'Произведение {number}') for number in range(titles))
+        )
+        db.executemany(
+            'INSERT INTO review (title_id, score, text, pub_date) '
+            'VALUES (?, ?, ?, ?)',
+            (
+                (number % titles, number % 10 + 1, 'Отзыв ' * 20, number)
+                for number in range(reviews)
+            )
+        )
+        db.execute(
+            'UPDATE title SET score_sum = (SELECT SUM(score) FROM review '
+            'WHERE title_id = title.id), reviews_count = (SELECT COUNT(*) '
+            'FROM review WHERE title_id = title.id)'
+        )
+    db.close()
+
+
+def read_reviews(db, title_id):
+    db.execute(
+        'SELECT score_sum, reviews_count FROM title WHERE id = ?', (title_id,)
+    ).fetchone()
+    db.execute(
+        'SELECT id, score, text, pub_date FROM review WHERE title_id = ? '
+        'ORDER BY pub_date DESC, id DESC LIMIT ?', (title_id, PAGE_SIZE)
+    ).fetchall()
+
+
+def write_review(db, title_id):
+    score = random.randint(1, 10)
+    db.execute('BEGIN')
+    try:
+        db.execute(
+            'INSERT INTO review (title_id, score, text, pub_date) '
+            'VALUES (?, ?, ?, ?)', (title_id, score, 'Отзыв', time.time())
+        )
+        db.execute(
+            'UPDATE title SET score_sum = score_sum + ?, '
+            'reviews_count = reviews_count + 1 WHERE id = ?',
+            (score, title_id)
+        )
+        db.execute('COMMIT')
+    except sqlite3.OperationalError:
+        db.execute('ROLLBACK')
+        raise
+
+
+def run_worker(path, pragmas, operation, titles, deadline, result):
+    db = sqlite3.connect(
+        path, timeout=DEFAULT_TIMEOUT, isolation_level=None,
+        check_same_thread=False
+    )
+    apply_pragmas(db, pragmas)
+    done = errors = 0
+    while time.monotonic() < deadline:
+        try:
+            operation(db, random.randrange(titles))
+        except sqlite3.OperationalError:
+            errors += 1
+        else:
+            done += 1
+    db.close()
+    result.append((operation, done, errors))
+
+
+def run_load(path, pragmas, seconds, readers, writers, titles):
+    result = []
+    deadline = time.monotonic() + seconds
+    threads = [
+        threading.Thread(target=run_worker, args=(
+            path, pragmas, operation, titles, deadline, result
+        ))
+        for operation, number in ((read_reviews, readers),
+                                  (write_review, writers))
+        for _ in range(number)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    def total(operation, index):
+        return sum(row[index] for row in result if row[0] is operation)
+
+    return {
+        'reads_per_s': round(total(read_reviews, 1) / seconds, 1),
+        'writes_per_s': round(total(write_review, 1) / seconds, 1),
+        'errors': total(read_reviews, 2) + total(write_review, 2),
+    }
+
+
+def run_sqlite_benchmark(seconds=5, readers=4, writers=2, titles=100,
+                         reviews=10000):
+    """
+    Пропускная способность чтения и записи при одновременной нагрузке
+    без настройки (off) и с SQLITE_PRAGMAS (on).
+    """
+    report = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for mode, pragmas in (('off', {}), ('on', settings.SQLITE_PRAGMAS)):
+            path = os.path.join(directory, f'{mode}.sqlite3')
+            create_load_db(path, titles, reviews)
+            report[mode] = run_load(
+                path, pragmas, seconds, readers, writers, titles
+            )
+    return report
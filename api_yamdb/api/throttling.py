@@ -0,0 +1,199 @@
+import fcntl
+import hashlib
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Состояние корзины в файле: число жетонов и время обновления.
+STATE = struct.Struct('<dd')
+
+
+def parse_rate(rate):
+    """'5/min' -> (емкость корзины, жетонов в секунду)."""
+    number, period = rate.split('/')
+    seconds = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+    return int(number), int(number) / seconds
+
+
+def get_refill_seconds():
+    """
+    Время полного пополнения самой медленной корзины: корзина без
+    запросов дольше этого времени полна, ее состояние можно забыть.
+    """
+    return max((
+        capacity / refill
+        for capacity, refill in map(parse_rate, filter(
+            None, api_settings.DEFAULT_THROTTLE_RATES.values()
+        ))
+    ), default=0)
+
+
+def take_token(state, capacity, refill, now):
+    """
+    Пополняет корзину за прошедшее время и забирает жетон.
+    Возвращает новое состояние и паузу до следующего жетона
+    (0, если запрос разрешен).
+    """
+    if state is None:
+        tokens = capacity
+    else:
+        tokens, updated = state
+        tokens = min(capacity, tokens + (now - updated) * refill)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill
+
+
+class MemoryBucketStore:
+    """Корзины в памяти процесса, не больше THROTTLE_MAX_KEYS ключей."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def consume(self, key, capacity, refill, now):
+        with self._lock:
+            state, wait = take_token(
+                self._buckets.get(key), capacity, refill, now
+            )
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > settings.THROTTLE_MAX_KEYS:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class FileBucketStore:
+    """
+    Корзины в каталоге THROTTLE_FILE_PATH, общие для процессов одной
+    машины: файл на ключ, изменение под блокировкой flock. Раз в
+    THROTTLE_SWEEP_INTERVAL секунд удаляются файлы полных корзин и
+    самые давние сверх THROTTLE_MAX_KEYS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_sweep = 0
+
+    def get_path(self, key):
+        name = hashlib.md5(key.encode()).hexdigest()
+        return os.path.join(settings.THROTTLE_FILE_PATH, name)
+
+    def consume(self, key, capacity, refill, now):
+        os.makedirs(settings.THROTTLE_FILE_PATH, exist_ok=True)
+        descriptor = os.open(self.get_path(key), os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX)
+            raw = os.pread(descriptor, STATE.size, 0)
+            state = STATE.unpack(raw) if len(raw) == STATE.size else None
+            state, wait = take_token(state, capacity, refill, now)
+            os.pwrite(descriptor, STATE.pack(*state), 0)
+        finally:
+            os.close(descriptor)
+        self.maybe_sweep()
+        return wait
+
+    def maybe_sweep(self):
+        with self._lock:
+            if time.monotonic() < self._next_sweep:
+                return
+            self._next_sweep = (
+                time.monotonic() + settings.THROTTLE_SWEEP_INTERVAL
+            )
+        self.sweep()
+
+    def sweep(self):
+        """Удаляет файлы корзин, начиная с давно не изменявшихся."""
+        entries = []
+        with os.scandir(settings.THROTTLE_FILE_PATH) as files:
+            for entry in files:
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    continue
+        entries.sort()
+        excess = len(entries) - settings.THROTTLE_MAX_KEYS
+        idle_before = time.time() - get_refill_seconds()
+        for index, (modified, path) in enumerate(entries):
+            if index >= excess and modified > idle_before:
+                break
+            self.remove(path)
+
+    def remove(self, path):
+        """Файл, который сейчас меняет другой процесс, не удаляется."""
+        try:
+            descriptor = os.open(path, os.O_RDWR)
+        except FileNotFoundError:
+            return
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            os.remove(path)
+        except (BlockingIOError, FileNotFoundError):
+            pass
+        finally:
+            os.close(descriptor)
+
+    def clear(self):
+        if not os.path.isdir(settings.THROTTLE_FILE_PATH):
+            return
+        for name in os.listdir(settings.THROTTLE_FILE_PATH):
+            os.remove(os.path.join(settings.THROTTLE_FILE_PATH, name))
+
+
+STORES = {
+    'memory': MemoryBucketStore(),
+    'file': FileBucketStore(),
+}
+
+
+def get_store():
+    return STORES[settings.THROTTLE_STORE]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Ограничение запросов корзиной жетонов. Лимит берется из
+    DEFAULT_THROTTLE_RATES по `throttle_scope` представления: '5/min' —
+    до 5 запросов подряд, затем по одному раз в 12 секунд. Ключ —
+    пользователь или IP анонима. БД не используется.
+    """
+
+    def allow_request(self, request, view):
+        self.wait_seconds = 0
+        scope = getattr(view, 'throttle_scope', None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        capacity, refill = parse_rate(rate)
+        ident = (
+            f'user:{request.user.pk}' if request.user.is_authenticated
+            else f'ip:{self.get_ident(request)}'
+        )
+        self.wait_seconds = get_store().consume(
+            f'{scope}:{ident}', capacity, refill, time.time()
+        )
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class WriteTokenBucketThrottle(TokenBucketThrottle):
+    """Ограничивает только изменяющие запросы."""
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            self.wait_seconds = 0
+            return True
+        return super().allow_request(request, view)
@@ -1,10 +1,14 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
+from api.async_views import comment_list, review_list, title_detail
 from api.views import (
+    BatchView,
+    CacheStatsView,
     CategoryViewSet,
     CommentsViewSet,
     CustomUserViewSet,
+    ExportView,
     GenreViewSet,
     ReviewsViewSet,
     SignupView,
@@ -31,5 +35,27 @@ router_v1.register(
 urlpatterns = [
     path('v1/auth/token/', TokenView.as_view(), name='get_token'),
     path('v1/auth/signup/', SignupView.as_view(), name='signup'),
+    path('v1/batch/', BatchView.as_view(), name='batch'),
+    path('v1/cache/stats/', CacheStatsView.as_view(), name='cache_stats'),
+    re_path(
+        r'^v1/export/(?P<resource>titles|reviews|comments)/$',
+        ExportView.as_view(),
+        name='export'
+    ),
+    path(
+        'v1/async/titles/<int:title_id>/',
+        title_detail,
+        name='async-title-detail'
+    ),
+    path(
+        'v1/async/titles/<int:title_id>/reviews/',
+        review_list,
+        name='async-reviews-list'
+    ),
+    path(
+        'v1/async/titles/<int:title_id>/reviews/<int:review_id>/comments/',
+        comment_list,
+        name='async-comments-list'
+    ),
     path('v1/', include(router_v1.urls)),
 ]
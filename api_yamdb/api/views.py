@@ -1,6 +1,6 @@
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from rest_framework import (
     filters,
     permissions,
@@ -9,55 +9,98 @@ from rest_framework import (
     viewsets
 )
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from api.core import send_confirmation_code
-from api.filters import TitleFilter
-from api.mixins import ListCreateDestroyMixin
+from api import cache
+from api.authentication import make_access_token
+from api.batch import run_batch
+from api.core import (
+    get_confirmation_code,
+    get_signup_conflict,
+    issue_confirmation_code,
+    make_confirmation_code,
+    send_confirmation_code
+)
+from api.export import CONTENT_TYPES, stream_export
+from api.filters import TitleFilter, TitleOrderingFilter, TitleSearchFilter
+from api.mixins import (
+    CachedListMixin,
+    ConditionalGetMixin,
+    LeaderboardMixin,
+    ListCreateDestroyMixin,
+    NestedResourceMixin,
+    SparseFieldsMixin
+)
 from api.permissions import (
     IsAdmin,
     IsAdminOrReadOnly,
     IsAuthorModeratorAdminOrReadOnly
 )
 from api.serializers import (
+    BatchSerializer,
     CategorySerializer,
     CommentsSerializer,
     CustomUserSerializer,
     CustomUserMeSerializer,
     GenreSerializer,
     ReviewsSerializer,
+    ScoreDistributionSerializer,
     SignupSerializer,
     TitleSerializer,
     TitleCreateSerializer,
     TokenSerializer
 )
-from reviews.models import Category, Genre, Title, Review
+from api.throttling import TokenBucketThrottle, WriteTokenBucketThrottle
+from reviews.catalog import title_catalog
+from reviews.models import (
+    SCORES,
+    Category,
+    CategoryLeaderboardEntry,
+    Comment,
+    Genre,
+    GenreLeaderboardEntry,
+    Review,
+    Title,
+    score_field
+)
 from users.models import CustomUser
 
 
-class CustomUserViewSet(viewsets.ModelViewSet):
-    queryset = CustomUser.objects.all()
+class CustomUserViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
+    queryset = CustomUser.objects.order_by('username')
     serializer_class = CustomUserSerializer
+    sparse_columns = {
+        field: (field,) for field in CustomUserSerializer.Meta.fields
+    }
     permission_classes = (permissions.IsAuthenticated, IsAdmin)
     search_fields = ('username',)
     filter_backends = (filters.SearchFilter,)
     http_method_names = ('get', 'post', 'patch', 'delete')
     lookup_field = 'username'
+    cursor_ordering = ('username', 'id')
+    query_budget = {
+        'list': 3, 'retrieve': 2, 'create': 4, 'partial_update': 3,
+        'destroy': 9, 'me': 3
+    }
 
     @action(detail=False,
             methods=('GET', 'PATCH'),
             permission_classes=(permissions.IsAuthenticated,))
     def me(self, request):
+        # В request.user только поля для проверки прав.
+        user = CustomUser.objects.get(pk=request.user.pk)
         if request.method == 'GET':
-            serializer = CustomUserSerializer(request.user)
+            serializer = CustomUserSerializer(user)
             return response.Response(
                 serializer.data,
                 status=status.HTTP_200_OK
             )
         serializer = CustomUserMeSerializer(
-            request.user,
+            user,
             data=request.data,
             partial=True,
         )
@@ -71,14 +114,17 @@ class CustomUserViewSet(viewsets.ModelViewSet):
 
 class TokenView(TokenObtainPairView):
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (TokenBucketThrottle,)
+    throttle_scope = 'token'
+    query_budget = {'post': 1}
 
     def post(self, request, *args, **kwargs):
         serializer = TokenSerializer(data=request.data)
         if serializer.is_valid():
-            username = serializer.validated_data['username']
-            user = get_object_or_404(CustomUser, username=username)
-            token = AccessToken.for_user(user)
-            return response.Response(token, status=status.HTTP_200_OK)
+            token = make_access_token(serializer.validated_data['user'])
+            return response.Response(
+                {'token': str(token)}, status=status.HTTP_200_OK
+            )
         return response.Response(
             serializer.errors,
             status=status.HTTP_400_BAD_REQUEST
@@ -86,33 +132,111 @@ class TokenView(TokenObtainPairView):
 
 
 class SignupView(APIView):
+    """
+    Регистрация и повторный запрос кода. Существующему пользователю
+    код выдается одним запросом, новый создается одной вставкой;
+    занятые email или username отлавливает уникальный индекс.
+    """
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (TokenBucketThrottle,)
+    throttle_scope = 'signup'
+    query_budget = {'post': 5}
 
     def post(self, request):
         email = request.data.get('email')
         username = request.data.get('username')
 
-        if CustomUser.objects.filter(email=email, username=username).exists():
-            send_confirmation_code(request)
+        confirmation_code = (
+            issue_confirmation_code(email, username)
+            if email and username else None
+        )
+        if confirmation_code is not None:
+            send_confirmation_code(email, confirmation_code)
             return response.Response(request.data, status=status.HTTP_200_OK)
 
         serializer = SignupSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        send_confirmation_code(request)
+        email = serializer.validated_data['email']
+        username = serializer.validated_data['username']
+        try:
+            with transaction.atomic():
+                user = serializer.save(
+                    confirmation_code=make_confirmation_code()
+                )
+            confirmation_code = get_confirmation_code(user)
+        except IntegrityError:
+            # Пользователя мог только что создать параллельный запрос.
+            confirmation_code = issue_confirmation_code(email, username)
+            if confirmation_code is None:
+                raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                    get_signup_conflict(email, username)
+                ]})
+        send_confirmation_code(email, confirmation_code)
         return response.Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(SparseFieldsMixin,
+                   ConditionalGetMixin,
+                   CachedListMixin,
+                   viewsets.ModelViewSet):
     """Произведения."""
+    read_from_replica = True
     serializer_class = TitleSerializer
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).order_by('name').select_related('category').prefetch_related('genre')
+    queryset = Title.objects.order_by('name').select_related(
+        'category'
+    ).prefetch_related('genre')
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    sparse_columns = {
+        'id': (),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating', 'reviews_count'),
+        'description': ('description',),
+        'genre': (),
+        'category': ('category', 'category__name', 'category__slug'),
+    }
+    sparse_prefetch = {'genre': 'genre'}
+    filter_backends = (
+        DjangoFilterBackend, TitleSearchFilter, TitleOrderingFilter
+    )
     filterset_class = TitleFilter
+    ordering_fields = ('name', 'year', 'rating', 'id')
     http_method_names = ('get', 'post', 'patch', 'delete')
+    cache_dependencies = ('titles', 'categories', 'genres', 'reviews')
+    query_budget = {
+        'list': 5, 'retrieve': 4, 'create': 16, 'partial_update': 7,
+        'destroy': 11, 'score_distribution': 2
+    }
+
+    @property
+    def cursor_ordering(self):
+        """Курсор следует сортировке `?ordering=`, по умолчанию имени."""
+        return TitleOrderingFilter().get_ordering(
+            self.request, self.queryset, self
+        ) or ('name', 'id')
+
+    def filter_queryset(self, queryset):
+        """Фильтры по жанру, категории и году обслуживает индекс каталога,
+        если он включен; из БД загружается только нужная страница."""
+        if (self.action == 'list'
+                and title_catalog.can_answer(self.request.query_params)):
+            return title_catalog.filter(self.request.query_params, queryset)
+        return super().filter_queryset(queryset)
+
+    @action(detail=True, url_path='score-distribution')
+    def score_distribution(self, request, pk=None):
+        """Распределение оценок из счетчиков произведения."""
+        title = get_object_or_404(
+            Title.objects.only(
+                'rating', 'reviews_count',
+                *[score_field(score) for score in SCORES]
+            ),
+            pk=pk
+        )
+        return response.Response(
+            ScoreDistributionSerializer(title).data,
+            status=status.HTTP_200_OK
+        )
 
     def get_serializer_class(self):
         """Определяет какой сериализатор будет использоваться
@@ -122,7 +246,9 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitleCreateSerializer
 
 
-class CategoryViewSet(ListCreateDestroyMixin):
+class CategoryViewSet(LeaderboardMixin,
+                      CachedListMixin,
+                      ListCreateDestroyMixin):
     """Категории."""
     serializer_class = CategorySerializer
     queryset = Category.objects.all()
@@ -130,9 +256,17 @@ class CategoryViewSet(ListCreateDestroyMixin):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_dependencies = ('categories',)
+    query_budget = {
+        'list': 3, 'create': 3, 'destroy': 7,
+        'top_rated': 5, 'trending': 5
+    }
+    leaderboard_model = CategoryLeaderboardEntry
 
 
-class GenreViewSet(ListCreateDestroyMixin):
+class GenreViewSet(LeaderboardMixin,
+                   CachedListMixin,
+                   ListCreateDestroyMixin):
     """Жанры."""
     serializer_class = GenreSerializer
     queryset = Genre.objects.all()
@@ -140,37 +274,118 @@ class GenreViewSet(ListCreateDestroyMixin):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_dependencies = ('genres',)
+    query_budget = {
+        'list': 3, 'create': 3, 'destroy': 7,
+        'top_rated': 5, 'trending': 5
+    }
+    leaderboard_model = GenreLeaderboardEntry
 
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+class ReviewsViewSet(SparseFieldsMixin,
+                     NestedResourceMixin,
+                     ConditionalGetMixin,
+                     CachedListMixin,
+                     viewsets.ModelViewSet):
     """Отзывы."""
+    read_from_replica = True
+    queryset = Review.objects.select_related('author')
+    parent_model = Title
+    parent_field = 'title'
+    parent_lookups = {'pk': 'title_id'}
     serializer_class = ReviewsSerializer
+    sparse_columns = {
+        'id': (),
+        'title': ('title',),
+        'text': ('text',),
+        'author': ('author', 'author__username'),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+    }
     permission_classes = (IsAuthorModeratorAdminOrReadOnly,)
+    throttle_classes = (WriteTokenBucketThrottle,)
+    throttle_scope = 'reviews'
     http_method_names = ('get', 'post', 'patch', 'delete')
+    cursor_ordering = ('-pub_date', '-id')
+    cache_dependencies = ('titles', 'reviews', 'users')
+    query_budget = {
+        'list': 5, 'retrieve': 3, 'create': 10, 'partial_update': 10,
+        'destroy': 10
+    }
 
-    def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        return title.reviews.all().select_related('author')
-
-    def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        serializer.save(author=self.request.user, title=title)
 
-
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(SparseFieldsMixin,
+                      NestedResourceMixin,
+                      ConditionalGetMixin,
+                      viewsets.ModelViewSet):
     """Комментарии."""
+    read_from_replica = True
+    queryset = Comment.objects.select_related('author')
+    parent_model = Review
+    parent_field = 'review'
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
     serializer_class = CommentsSerializer
+    sparse_columns = {
+        'id': (),
+        'review': ('review',),
+        'text': ('text',),
+        'author': ('author', 'author__username'),
+        'pub_date': ('pub_date',),
+    }
     permission_classes = (IsAuthorModeratorAdminOrReadOnly,)
+    throttle_classes = (WriteTokenBucketThrottle,)
+    throttle_scope = 'comments'
     http_method_names = ('get', 'post', 'patch', 'delete')
+    cursor_ordering = ('pub_date', 'id')
+    query_budget = {
+        'list': 5, 'retrieve': 3, 'create': 4, 'partial_update': 3,
+        'destroy': 4
+    }
+
 
-    def get_queryset(self):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, pk=review_id)
-        return review.comments.all().select_related('author')
+class BatchView(APIView):
+    """
+    Несколько GET-запросов за один HTTP-запрос. Вложенные запросы
+    проходят через те же представления с авторизацией вызывающего
+    и укладываются в их бюджеты SQL-запросов (см. api.batch).
+    """
+    permission_classes = (permissions.AllowAny,)
 
-    def perform_create(self, serializer):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, pk=review_id)
-        serializer.save(author=self.request.user, review=review)
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        urls = [item['url'] for item in serializer.validated_data['requests']]
+        return response.Response(
+            {'responses': run_batch(request._request, urls)},
+            status=status.HTTP_200_OK
+        )
+
+
+class CacheStatsView(APIView):
+    """Счетчики попаданий и промахов кэша ответов."""
+    permission_classes = (permissions.IsAuthenticated, IsAdmin)
+    query_budget = {'get': 1}
+
+    def get(self, request):
+        return response.Response(cache.get_stats(), status=status.HTTP_200_OK)
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка произведений, отзывов и комментариев."""
+    permission_classes = (permissions.IsAuthenticated, IsAdmin)
+    query_budget = {'get': 3}
+
+    def get(self, request, resource):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in CONTENT_TYPES:
+            raise ValidationError(
+                {'output': f'Допустимые форматы: {", ".join(CONTENT_TYPES)}.'}
+            )
+        export = StreamingHttpResponse(
+            stream_export(resource, output),
+            content_type=CONTENT_TYPES[output]
+        )
+        export['Content-Disposition'] = (
+            f'attachment; filename="{resource}.{output}"'
+        )
+        return export
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -34,6 +35,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.QueryBudgetMiddleware',
+    'api.middleware.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -61,9 +64,92 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 60)),
     }
 }
 
+# Реплики для чтения (алиасы DATABASES). Локально реплика — копия
+# файла БД по пути DB_REPLICA_NAME, в тестах она совпадает с основной.
+DATABASE_REPLICAS = []
+if os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME'),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append('replica')
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+# Сколько секунд после записи клиент читает из основной БД.
+REPLICA_STICKY_SECONDS = 10
+# Кэш отметок о записи; общий для всех процессов (см. CACHES).
+REPLICA_STICKY_CACHE_ALIAS = 'sticky'
+# Потоков для ORM в асинхронных представлениях (/api/v1/async/).
+ASYNC_DB_WORKERS = int(os.getenv('ASYNC_DB_WORKERS', 8))
+# Пакетные GET-запросы (/api/v1/batch/): предел размера пакета
+# и потоков, выполняющих вложенные запросы параллельно.
+BATCH_MAX_REQUESTS = 20
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', 4))
+
+# PRAGMA для каждого нового соединения с SQLite (api.signals).
+# WAL не блокирует читателей во время записи, busy_timeout (мс)
+# ждет блокировку вместо ошибки "database is locked".
+SQLITE_TUNING = os.getenv('SQLITE_TUNING', 'True') == 'True'
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': os.getenv(
+            'RESPONSE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv(
+            'RESPONSE_CACHE_LOCATION', 'api_yamdb-responses'
+        ),
+        'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300)),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # Отметки чтения из основной БД после записи (api.routers): файлы
+    # общие для всех процессов машины. Для нескольких машин задайте
+    # общий бэкенд через REPLICA_STICKY_CACHE_BACKEND и
+    # REPLICA_STICKY_CACHE_LOCATION. MAX_ENTRIES должен превышать
+    # число клиентов, пишущих за REPLICA_STICKY_SECONDS: сверх него
+    # часть живых отметок вытесняется, и их клиенты читают реплику.
+    'sticky': {
+        'BACKEND': os.getenv(
+            'REPLICA_STICKY_CACHE_BACKEND',
+            'api.routers.StickyFileBasedCache'
+        ),
+        'LOCATION': os.getenv(
+            'REPLICA_STICKY_CACHE_LOCATION',
+            os.path.join(tempfile.gettempdir(), 'api_yamdb-sticky')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(
+                os.getenv('REPLICA_STICKY_MAX_ENTRIES', 100000)
+            ),
+        },
+    },
+}
+
+# Кэш ответов списков; сбрасывается версиями ресурсов, записанными
+# в тот же кэш. Версии должны быть общими для всех процессов: при
+# нескольких воркерах задайте общий бэкенд (например, FileBasedCache
+# или DatabaseCache через RESPONSE_CACHE_BACKEND и
+# RESPONSE_CACHE_LOCATION). Кэш включается явно, TIMEOUT ограничивает
+# жизнь ответа, если сброс версии не дошел до кэша.
+RESPONSE_CACHE = os.getenv('RESPONSE_CACHE') == 'True'
+RESPONSE_CACHE_ALIAS = 'responses'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -99,21 +185,64 @@ AUTH_USER_MODEL = 'users.CustomUser'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 NO_REPLY_MAIL = 'api_yamdb@example.com'
+# Письма ставятся в очередь и отправляются командой send_emails.
+# С этими бэкендами письмо отправляется сразу после коммита.
+EMAIL_OUTBOX_INLINE_BACKENDS = (
+    'django.core.mail.backends.console.EmailBackend',
+    'django.core.mail.backends.filebased.EmailBackend',
+    'django.core.mail.backends.locmem.EmailBackend',
+)
+
+# Код подтверждения без хранения в базе: HMAC от id пользователя,
+# его соли и окна времени. Повторная отправка ничего не записывает.
+CONFIRMATION_CODE_STATELESS = (
+    os.getenv('CONFIRMATION_CODE_STATELESS') == 'True'
+)
+CONFIRMATION_CODE_TTL = timedelta(hours=1)
 
 PAGE_SIZE = 10
 
+# Индекс каталога в памяти процесса для фильтров /api/v1/titles/.
+# Обновляется сигналами только в своем процессе.
+TITLE_CATALOG_INDEX = os.getenv('TITLE_CATALOG_INDEX') == 'True'
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
-    'PAGE_SIZE': PAGE_SIZE
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.OffsetOrCursorPagination',
+    'PAGE_SIZE': PAGE_SIZE,
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '5/min',
+        'token': '10/min',
+        'reviews': '30/min',
+        'comments': '60/min',
+    },
+    # Число доверенных прокси перед приложением: без них X-Forwarded-For
+    # задает клиент, и ограничение запросов считается по REMOTE_ADDR.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
+# Хранилище корзин ограничения запросов: memory — в процессе,
+# file — общий каталог для всех процессов машины. В обоих хранится
+# не больше THROTTLE_MAX_KEYS корзин; каталог file чистится раз
+# в THROTTLE_SWEEP_INTERVAL секунд.
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', 'memory')
+THROTTLE_FILE_PATH = BASE_DIR / 'throttle'
+THROTTLE_MAX_KEYS = 10000
+THROTTLE_SWEEP_INTERVAL = 60
+
+# Снимки пользователей для аутентификации в памяти процесса.
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_USER_CACHE_TTL = 60
+# Роль в токене доступа: права проверяются без БД и кэша, но смена
+# роли и блокировка вступают в силу только с новым токеном.
+JWT_ROLE_CLAIMS = os.getenv('JWT_ROLE_CLAIMS') == 'True'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
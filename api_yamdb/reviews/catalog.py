@@ -0,0 +1,236 @@
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import transaction
+
+from reviews.models import Category, Genre, GenreTitle, Title
+
+INDEX_QUERY_PARAMS = frozenset(
+    ('genre', 'genre_all', 'category', 'year', 'limit', 'offset', 'fields')
+)
+FILTER_QUERY_PARAMS = ('genre', 'genre_all', 'category', 'year')
+
+
+def split_slugs(value):
+    return [slug.strip().lower() for slug in value.split(',') if slug.strip()]
+
+
+class CatalogPage:
+    """
+    Упорядоченный список id произведений, найденных индексом.
+    Из БД загружается только запрошенный срез.
+    """
+
+    def __init__(self, ids, queryset):
+        self.ids = ids
+        self.queryset = queryset
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        ids = self.ids[index]
+        titles = self.queryset.order_by().in_bulk(ids)
+        return [titles[pk] for pk in ids if pk in titles]
+
+
+class TitleCatalogIndex:
+    """
+    Колоночный индекс каталога в памяти процесса.
+    Каждому произведению выделяется слот: массивы `ids`, `years` и
+    `categories` хранят его поля, а битовые маски (int) по годам,
+    категориям и жанрам позволяют отвечать на комбинации фильтров
+    пересечением и объединением масок без обращения к БД.
+    Слоты удаленных и измененных произведений переиспользуются
+    (сначала младшие), поэтому массивы и маски не растут с числом
+    обновлений.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'TITLE_CATALOG_INDEX', False)
+
+    def can_answer(self, query_params):
+        return (
+            self.enabled
+            and set(query_params) <= INDEX_QUERY_PARAMS
+            and any(param in query_params for param in FILTER_QUERY_PARAMS)
+            and query_params.get('year', '0').isdigit()
+        )
+
+    def invalidate(self):
+        """Помечает индекс устаревшим, он перестроится при запросе."""
+        with self._lock:
+            self._built = False
+
+    def build(self):
+        with self._lock:
+            self.ids = array('q')
+            self.names = []
+            self.years = array('q')
+            self.categories = array('q')
+            self.slots = {}
+            self.free_slots = []
+            self.order_keys = []
+            self.order = []
+            self.alive = 0
+            self.year_bits = {}
+            self.category_bits = {}
+            self.genre_bits = {}
+            self.category_slugs = dict(
+                Category.objects.values_list('id', 'slug')
+            )
+            self.genre_slugs = dict(Genre.objects.values_list('id', 'slug'))
+            titles = Title.objects.order_by('name', 'id').values_list(
+                'id', 'name', 'year', 'category_id'
+            )
+            for title_id, name, year, category_id in titles.iterator():
+                self._add_title(title_id, name, year, category_id)
+            genres = GenreTitle.objects.values_list('title_id', 'genre_id')
+            for title_id, genre_id in genres.iterator():
+                slot = self.slots.get(title_id)
+                if slot is not None:
+                    self._set_bit(self.genre_bits, genre_id, slot)
+            self._built = True
+
+    def ensure_built(self):
+        with self._lock:
+            if not self._built:
+                self.build()
+
+    def refresh_titles(self, title_ids):
+        """Перечитывает из БД данные и жанры указанных произведений."""
+        title_ids = set(title_ids)
+        with self._lock:
+            if not self._built:
+                return
+            rows = Title.objects.filter(pk__in=title_ids).values_list(
+                'id', 'name', 'year', 'category_id'
+            )
+            genres = GenreTitle.objects.filter(
+                title_id__in=title_ids
+            ).values_list('title_id', 'genre_id')
+            for title_id in title_ids:
+                self._remove_title(title_id)
+            for row in rows:
+                self._add_title(*row)
+            for title_id, genre_id in genres:
+                self._set_bit(self.genre_bits, genre_id, self.slots[title_id])
+
+    def set_slug(self, model, pk, slug):
+        with self._lock:
+            if not self._built:
+                return
+            if model is Genre:
+                self.genre_slugs[pk] = slug
+            else:
+                self.category_slugs[pk] = slug
+
+    def filter(self, query_params, queryset):
+        """Возвращает ленивую страницу произведений по фильтрам."""
+        self.ensure_built()
+        with self._lock:
+            mask = self.alive
+            if query_params.get('year'):
+                mask &= self.year_bits.get(int(query_params['year']), 0)
+            if query_params.get('category'):
+                mask &= self._union(
+                    self.category_bits, self.category_slugs,
+                    [query_params['category'].lower()]
+                )
+            genres = split_slugs(query_params.get('genre', ''))
+            if genres:
+                mask &= self._union(self.genre_bits, self.genre_slugs, genres)
+            for slug in split_slugs(query_params.get('genre_all', '')):
+                mask &= self._union(self.genre_bits, self.genre_slugs, [slug])
+            ids = self._ordered_ids(mask)
+        return CatalogPage(ids, queryset)
+
+    def _union(self, bits, slugs, terms):
+        mask = 0
+        for pk, slug in slugs.items():
+            if any(term in slug.lower() for term in terms):
+                mask |= bits.get(pk, 0)
+        return mask
+
+    def _ordered_ids(self, mask):
+        if not mask:
+            return array('q')
+        flags = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+        size = len(flags) * 8
+        return array('q', (
+            self.ids[slot] for slot in self.order
+            if slot < size and flags[slot >> 3] >> (slot & 7) & 1
+        ))
+
+    def _set_bit(self, bits, key, slot):
+        bits[key] = bits.get(key, 0) | (1 << slot)
+
+    def _clear_bit(self, bits, key, slot):
+        if key in bits:
+            bits[key] &= ~(1 << slot)
+
+    def _add_title(self, title_id, name, year, category_id):
+        if self.free_slots:
+            slot = heapq.heappop(self.free_slots)
+            self.ids[slot] = title_id
+            self.names[slot] = name
+            self.years[slot] = year
+            self.categories[slot] = category_id or 0
+        else:
+            slot = len(self.ids)
+            self.ids.append(title_id)
+            self.names.append(name)
+            self.years.append(year)
+            self.categories.append(category_id or 0)
+        self.slots[title_id] = slot
+        index = bisect_left(self.order_keys, (name, title_id))
+        self.order_keys.insert(index, (name, title_id))
+        self.order.insert(index, slot)
+        self.alive |= 1 << slot
+        self._set_bit(self.year_bits, year, slot)
+        if category_id:
+            self._set_bit(self.category_bits, category_id, slot)
+
+    def _remove_title(self, title_id):
+        slot = self.slots.pop(title_id, None)
+        if slot is None:
+            return
+        index = bisect_left(self.order_keys, (self.names[slot], title_id))
+        del self.order[index]
+        del self.order_keys[index]
+        self.alive &= ~(1 << slot)
+        self._clear_bit(self.year_bits, self.years[slot], slot)
+        self._clear_bit(self.category_bits, self.categories[slot], slot)
+        for genre_id in list(self.genre_bits):
+            self._clear_bit(self.genre_bits, genre_id, slot)
+        self.ids[slot] = 0
+        self.names[slot] = None
+        heapq.heappush(self.free_slots, slot)
+
+
+title_catalog = TitleCatalogIndex()
+
+
+def schedule_refresh(title_ids):
+    """Обновляет индекс после фиксации транзакции."""
+    if title_catalog.enabled:
+        title_ids = list(title_ids)
+        transaction.on_commit(lambda: title_catalog.refresh_titles(title_ids))
+
+
+def schedule_invalidate():
+    if title_catalog.enabled:
+        transaction.on_commit(title_catalog.invalidate)
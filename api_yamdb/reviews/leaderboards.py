@@ -0,0 +1,213 @@
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from reviews.models import (
+    CategoryLeaderboardEntry,
+    GenreLeaderboardEntry,
+    GenreTitle,
+    Review,
+    Title
+)
+
+# Рейтинг и область (поле модели), в которой он строится.
+BOARDS = (
+    (CategoryLeaderboardEntry, 'category'),
+    (GenreLeaderboardEntry, 'genre'),
+)
+DEFAULT_MIN_REVIEWS = 3
+TREND_HALF_LIFE = timedelta(days=3.5)
+TREND_WINDOW = timedelta(days=7)
+DECAY = math.log(2) / TREND_HALF_LIFE.total_seconds()
+BATCH_SIZE = 1000
+
+# Активность хранится как логарифм суммы exp(DECAY * t) по отзывам:
+# у всех произведений она затухает одинаково, поэтому порядок по trend
+# совпадает с порядком по текущей затухающей сумме, а пересчитывать
+# строки со временем не нужно.
+
+
+def activity(moment):
+    return DECAY * moment.timestamp()
+
+
+def add_activity(trend, moment):
+    value = activity(moment)
+    if trend is None:
+        return value
+    high, low = max(trend, value), min(trend, value)
+    return high + math.log1p(math.exp(low - high))
+
+
+def remove_activity(trend, moment):
+    """Вычитает вклад отзыва; None, если активности не осталось."""
+    if trend is None:
+        return None
+    difference = activity(moment) - trend
+    if difference >= -1e-9:
+        return None
+    return trend + math.log1p(-math.exp(difference))
+
+
+def get_rating(score_sum, reviews_count):
+    return score_sum / reviews_count if reviews_count else None
+
+
+def get_board(scope):
+    return next(model for model, name in BOARDS if name == scope)
+
+
+def get_title_trend(title_id):
+    for model, _ in BOARDS:
+        entry = model.objects.filter(title_id=title_id).values('trend')
+        entry = entry.first()
+        if entry is not None:
+            return entry['trend']
+    trend = None
+    since = timezone.now() - TREND_WINDOW
+    for pub_date in Review.objects.filter(
+        title_id=title_id, pub_date__gte=since
+    ).values_list('pub_date', flat=True):
+        trend = add_activity(trend, pub_date)
+    return trend
+
+
+def add_title_entries(scope, title_id, scope_ids, title=None):
+    """Добавляет произведение в рейтинги категории или жанров."""
+    scope_ids = set(scope_ids) - {None}
+    if not scope_ids:
+        return
+    if title is None:
+        title = Title.objects.filter(pk=title_id).values(
+            'score_sum', 'reviews_count'
+        ).first()
+        if title is None:
+            return
+        trend = get_title_trend(title_id)
+    else:
+        trend = None
+    model = get_board(scope)
+    model.objects.bulk_create([
+        model(
+            title_id=title_id,
+            rating=get_rating(title['score_sum'], title['reviews_count']),
+            reviews_count=title['reviews_count'],
+            trend=trend,
+            **{f'{scope}_id': scope_id}
+        )
+        for scope_id in scope_ids
+    ], ignore_conflicts=True)
+
+
+def remove_title_entries(scope, title_id, scope_ids=None):
+    entries = get_board(scope).objects.filter(title_id=title_id)
+    if scope_ids is not None:
+        entries = entries.filter(**{f'{scope}_id__in': scope_ids})
+    entries.delete()
+
+
+def add_new_title(title):
+    """Новое произведение без отзывов: агрегаты известны без запросов."""
+    add_title_entries('category', title.pk, [title.category_id], title={
+        'score_sum': title.score_sum, 'reviews_count': title.reviews_count
+    })
+
+
+def move_title_category(title_id, new_category_id):
+    entries = CategoryLeaderboardEntry.objects.filter(title_id=title_id)
+    if new_category_id is None:
+        entries.delete()
+    elif not entries.update(category_id=new_category_id):
+        add_title_entries('category', title_id, [new_category_id])
+
+
+def update_title_entries(title_id, added_at=None, removed_at=None):
+    """
+    Переносит в рейтинги новые агрегаты оценок произведения и
+    учитывает время добавленного или удаленного отзыва в активности.
+    """
+    title = Title.objects.filter(pk=title_id).values(
+        'score_sum', 'reviews_count'
+    ).first()
+    if title is None:
+        return
+    changes = {
+        'rating': get_rating(title['score_sum'], title['reviews_count']),
+        'reviews_count': title['reviews_count'],
+    }
+    if removed_at and removed_at < timezone.now() - TREND_WINDOW:
+        # Вклад старого отзыва мог быть уже убран компактизацией.
+        removed_at = None
+    if added_at or removed_at:
+        trend = get_title_trend(title_id)
+        if added_at:
+            trend = add_activity(trend, added_at)
+        if removed_at:
+            trend = remove_activity(trend, removed_at)
+        changes['trend'] = trend
+    for model, _ in BOARDS:
+        model.objects.filter(title_id=title_id).update(**changes)
+
+
+def top_rated(model, scope_id, min_reviews=DEFAULT_MIN_REVIEWS):
+    return model.objects.filter(
+        **{f'{dict(BOARDS)[model]}_id': scope_id},
+        reviews_count__gte=max(1, min_reviews)
+    ).order_by(F('rating').desc(nulls_last=True), 'title_id')
+
+
+def trending(model, scope_id):
+    return model.objects.filter(
+        **{f'{dict(BOARDS)[model]}_id': scope_id}, trend__isnull=False
+    ).order_by(F('trend').desc(nulls_last=True), 'title_id')
+
+
+def rebuild_leaderboards():
+    """
+    Компактизация: пересоздает рейтинги по текущим произведениям,
+    активность считает только по отзывам за TREND_WINDOW.
+    Возвращает количество созданных строк.
+    """
+    since = timezone.now() - TREND_WINDOW
+    trends = defaultdict(lambda: None)
+    recent = Review.objects.filter(pub_date__gte=since).order_by().values_list(
+        'title_id', 'pub_date'
+    )
+    for title_id, pub_date in recent.iterator():
+        trends[title_id] = add_activity(trends[title_id], pub_date)
+    titles = {
+        title['id']: title for title in Title.objects.values(
+            'id', 'category_id', 'score_sum', 'reviews_count'
+        ).iterator()
+    }
+    scopes = {
+        'category': [
+            (title['id'], title['category_id']) for title in titles.values()
+            if title['category_id'] is not None
+        ],
+        'genre': GenreTitle.objects.values_list(
+            'title_id', 'genre_id'
+        ).distinct(),
+    }
+    created = 0
+    for model, scope in BOARDS:
+        model.objects.all().delete()
+        entries = [
+            model(
+                title_id=title_id,
+                rating=get_rating(
+                    titles[title_id]['score_sum'],
+                    titles[title_id]['reviews_count']
+                ),
+                reviews_count=titles[title_id]['reviews_count'],
+                trend=trends[title_id],
+                **{f'{scope}_id': scope_id}
+            )
+            for title_id, scope_id in scopes[scope]
+        ]
+        model.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+        created += len(entries)
+    return created
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.leaderboards import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересоздает рейтинги категорий и жанров и убирает из активности '
+        'отзывы старше недели. Запускается периодически (cron).'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = rebuild_leaderboards()
+        self.stdout.write(
+            self.style.SUCCESS(f'Строк в рейтингах: {created}')
+        )
@@ -0,0 +1,100 @@
+# Generated by Django 3.2 on 2026-10-18 03:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_leaderboards(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    CategoryEntry = apps.get_model('reviews', 'CategoryLeaderboardEntry')
+    GenreEntry = apps.get_model('reviews', 'GenreLeaderboardEntry')
+    titles = {
+        title['id']: title for title in Title.objects.values(
+            'id', 'category_id', 'score_sum', 'reviews_count'
+        )
+    }
+
+    def values(title_id):
+        count = titles[title_id]['reviews_count']
+        return {
+            'title_id': title_id,
+            'reviews_count': count,
+            'rating': titles[title_id]['score_sum'] / count if count else None
+        }
+
+    CategoryEntry.objects.bulk_create([
+        CategoryEntry(category_id=title['category_id'], **values(title_id))
+        for title_id, title in titles.items() if title['category_id']
+    ], batch_size=1000)
+    GenreEntry.objects.bulk_create([
+        GenreEntry(genre_id=genre_id, **values(title_id))
+        for title_id, genre_id in GenreTitle.objects.values_list(
+            'title_id', 'genre_id'
+        ).distinct()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_score_distribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenreLeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(null=True, verbose_name='Рейтинг')),
+                ('reviews_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('trend', models.FloatField(null=True, verbose_name='Активность (логарифм затухающей суммы)')),
+                ('genre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='reviews.genre', verbose_name='Жанр')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг в жанре',
+                'verbose_name_plural': 'Рейтинги в жанрах',
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryLeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(null=True, verbose_name='Рейтинг')),
+                ('reviews_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('trend', models.FloatField(null=True, verbose_name='Активность (логарифм затухающей суммы)')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='reviews.category', verbose_name='Категория')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг в категории',
+                'verbose_name_plural': 'Рейтинги в категориях',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='genreleaderboardentry',
+            index=models.Index(fields=['genre', '-rating', 'title'], name='genre_top_rated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genreleaderboardentry',
+            index=models.Index(fields=['genre', '-trend', 'title'], name='genre_trending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='genreleaderboardentry',
+            constraint=models.UniqueConstraint(fields=('genre', 'title'), name='unique_genre_leaderboard_title'),
+        ),
+        migrations.AddIndex(
+            model_name='categoryleaderboardentry',
+            index=models.Index(fields=['category', '-rating', 'title'], name='category_top_rated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='categoryleaderboardentry',
+            index=models.Index(fields=['category', '-trend', 'title'], name='category_trending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='categoryleaderboardentry',
+            constraint=models.UniqueConstraint(fields=('category', 'title'), name='unique_category_leaderboard_title'),
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
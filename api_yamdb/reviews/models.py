@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, router, transaction
 
 from django.core.validators import (MaxValueValidator,
                                     MinValueValidator,
@@ -7,6 +7,22 @@ from django.core.validators import (MaxValueValidator,
 from users.models import CustomUser
 
 LENGTH_TEXT = 15
+MIN_SCORE = 1
+MAX_SCORE = 10
+SCORES = range(MIN_SCORE, MAX_SCORE + 1)
+
+
+def score_field(score):
+    """Имя счетчика отзывов с оценкой score у произведения."""
+    return f'score_{score}_count'
+
+
+# Агрегаты отзывов произведения меняются только выражениями F()
+# (reviews.ratings) и не записываются обычным Title.save().
+AGGREGATE_FIELDS = (
+    'score_sum', 'reviews_count', 'rating',
+    *[score_field(score) for score in SCORES]
+)
 
 
 class Genre(models.Model):
@@ -91,15 +107,171 @@ class Title(models.Model):
         verbose_name='Категория',
         null=True
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0
+    )
+    rating = models.FloatField(
+        verbose_name='Средняя оценка (0 без отзывов)',
+        default=0
+    )
+    # Распределение оценок: score_field(score) для score из SCORES.
+    score_1_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 1',
+        default=0
+    )
+    score_2_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 2',
+        default=0
+    )
+    score_3_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 3',
+        default=0
+    )
+    score_4_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 4',
+        default=0
+    )
+    score_5_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 5',
+        default=0
+    )
+    score_6_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 6',
+        default=0
+    )
+    score_7_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 7',
+        default=0
+    )
+    score_8_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 8',
+        default=0
+    )
+    score_9_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 9',
+        default=0
+    )
+    score_10_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 10',
+        default=0
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         ordering = ('name',)
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        # Сортировки ?ordering= по name, year, rating и id вместе
+        # с фильтрами по году и категории обслуживаются индексами.
+        indexes = [
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+            models.Index(fields=['year', 'id'], name='title_year_id_idx'),
+            models.Index(
+                fields=['rating', 'id'], name='title_rating_id_idx'
+            ),
+            models.Index(
+                fields=['year', 'name', 'id'], name='title_year_name_idx'
+            ),
+            models.Index(
+                fields=['year', 'rating', 'id'], name='title_year_rating_idx'
+            ),
+            models.Index(
+                fields=['category', 'name', 'id'],
+                name='title_category_name_idx'
+            ),
+            models.Index(
+                fields=['category', 'year', 'id'],
+                name='title_category_year_idx'
+            ),
+            models.Index(
+                fields=['category', 'rating', 'id'],
+                name='title_category_rating_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name[:LENGTH_TEXT]
 
+    def save(self, *args, **kwargs):
+        """
+        Обновление не перезаписывает агрегаты отзывов: загруженные
+        значения могли устареть, пока параллельный запрос менял отзывы.
+        """
+        if (not self._state.adding
+                and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in AGGREGATE_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает категорию из БД, чтобы перенести рейтинги."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        return instance
+
+    @property
+    def score_distribution(self):
+        """Количество отзывов с каждой оценкой."""
+        return {
+            score: getattr(self, score_field(score)) for score in SCORES
+        }
+
+
+class FullTextMatch(models.Lookup):
+    """Поиск по полнотекстовому индексу: `document__match`."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class FullTextField(models.TextField):
+    """Скрытый столбец таблицы FTS5, совпадающий с ее именем."""
+
+
+FullTextField.register_lookup(FullTextMatch)
+
+
+class TitleSearchIndex(models.Model):
+    """
+    Полнотекстовый индекс SQLite FTS5 по названию и описанию.
+    Таблица создается миграцией и заполняется сигналами Title.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_index',
+        verbose_name='Произведение'
+    )
+    document = FullTextField(db_column='reviews_title_fts')
+    rank = models.FloatField(verbose_name='Релевантность')
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_title_fts'
+        verbose_name = 'Поисковый индекс произведения'
+        verbose_name_plural = 'Поисковый индекс произведений'
+
 
 class GenreTitle(models.Model):
     """Вспомогательная модель, связывает жанры и произведения."""
@@ -118,11 +290,108 @@ class GenreTitle(models.Model):
         ordering = ('id',)
         verbose_name = 'Соответствие жанра и произведения'
         verbose_name_plural = 'Таблица соответствия жанров и произведений'
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'], name='genre_title_genre_idx'
+            ),
+            models.Index(
+                fields=['title', 'genre'], name='genre_title_title_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.title} принадлежит жанр(у/ам) {self.genre}'
 
 
+class LeaderboardEntry(models.Model):
+    """
+    Строка материализованного рейтинга: произведение в категории
+    или жанре. Обновляется сигналами отзывов, пересчитывается командой
+    compact_leaderboards.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Произведение'
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        null=True
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0
+    )
+    trend = models.FloatField(
+        verbose_name='Активность (логарифм затухающей суммы)',
+        null=True
+    )
+
+    class Meta:
+        abstract = True
+
+
+class CategoryLeaderboardEntry(LeaderboardEntry):
+    """Рейтинг произведений категории."""
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='leaderboard',
+        verbose_name='Категория'
+    )
+
+    class Meta:
+        verbose_name = 'Рейтинг в категории'
+        verbose_name_plural = 'Рейтинги в категориях'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['category', 'title'],
+                name='unique_category_leaderboard_title'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['category', '-rating', 'title'],
+                name='category_top_rated_idx'
+            ),
+            models.Index(
+                fields=['category', '-trend', 'title'],
+                name='category_trending_idx'
+            ),
+        ]
+
+
+class GenreLeaderboardEntry(LeaderboardEntry):
+    """Рейтинг произведений жанра."""
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        related_name='leaderboard',
+        verbose_name='Жанр'
+    )
+
+    class Meta:
+        verbose_name = 'Рейтинг в жанре'
+        verbose_name_plural = 'Рейтинги в жанрах'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['genre', 'title'],
+                name='unique_genre_leaderboard_title'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['genre', '-rating', 'title'],
+                name='genre_top_rated_idx'
+            ),
+            models.Index(
+                fields=['genre', '-trend', 'title'],
+                name='genre_trending_idx'
+            ),
+        ]
+
+
 class Review(models.Model):
     """Модель отзывов."""
     title = models.ForeignKey(
@@ -143,14 +412,18 @@ class Review(models.Model):
         blank=True,
         verbose_name='Оценка',
         validators=[
-            MinValueValidator(1),
-            MaxValueValidator(10),
+            MinValueValidator(MIN_SCORE),
+            MaxValueValidator(MAX_SCORE),
         ]
     )
     pub_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата создания'
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         ordering = ('-pub_date',)
@@ -161,10 +434,51 @@ class Review(models.Model):
                 fields=['author', 'title'], name='only_unique_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'modified'], name='review_title_modified_idx'
+            ),
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='review_author_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:LENGTH_TEXT]
 
+    def get_stored_score(self, using):
+        """
+        Оценка из БД под блокировкой строки: от нее, а не от оценки
+        загруженного ранее объекта, считается изменение агрегатов.
+        """
+        if self.pk is None:
+            return None
+        return type(self)._base_manager.using(using).select_for_update(
+        ).filter(pk=self.pk).values_list('score', flat=True).first()
+
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв и агрегаты произведения в одной транзакции."""
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using):
+            self._stored_score = self.get_stored_score(using)
+            super().save(*args, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        """Снимает с агрегатов оценку из БД, а не из объекта."""
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            stored_score = self.get_stored_score(using)
+            if stored_score is not None:
+                self.score = stored_score
+            return super().delete(using=using, keep_parents=keep_parents)
+
 
 class Comment(models.Model):
     """Модель комментариев."""
@@ -185,11 +499,25 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name='Дата создания'
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         ordering = ('pub_date',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', 'modified'],
+                name='comment_review_modified_idx'
+            ),
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:LENGTH_TEXT]
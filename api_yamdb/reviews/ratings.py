@@ -0,0 +1,73 @@
+from django.db.models import (
+    Count, F, FloatField, OuterRef, Subquery, Sum, Value
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from reviews.models import SCORES, Review, Title, score_field
+
+
+def average(score_sum, reviews_count):
+    """Выражение средней оценки; 0, если отзывов нет."""
+    return Coalesce(
+        Cast(score_sum, FloatField()) / NullIf(reviews_count, Value(0)),
+        Value(0.0)
+    )
+
+
+def change_title_rating(title_id, added=None, removed=None):
+    """
+    Учитывает в агрегатах произведения добавленную и/или снятую оценку:
+    сумму оценок, число отзывов и счетчики распределения оценок.
+    """
+    changes = {}
+    score_delta = count_delta = 0
+    for score, delta in ((added, 1), (removed, -1)):
+        if score is None:
+            continue
+        score_delta += delta * score
+        count_delta += delta
+        changes[score_field(score)] = F(score_field(score)) + delta
+    Title.objects.filter(pk=title_id).update(
+        score_sum=F('score_sum') + score_delta,
+        reviews_count=F('reviews_count') + count_delta,
+        rating=average(
+            F('score_sum') + score_delta, F('reviews_count') + count_delta
+        ),
+        modified=timezone.now(),
+        **changes
+    )
+
+
+def rebuild_title_ratings(titles=None):
+    """
+    Пересчитывает агрегаты оценок с нуля по таблице отзывов.
+    Возвращает количество обновленных произведений.
+    """
+    if titles is None:
+        titles = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    distribution = {
+        score_field(score): Coalesce(Subquery(
+            reviews.filter(score=score).annotate(
+                total=Count('id')
+            ).values('total')
+        ), 0)
+        for score in SCORES
+    }
+    updated = titles.update(
+        score_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0
+        ),
+        reviews_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')),
+            0
+        ),
+        modified=timezone.now(),
+        **distribution
+    )
+    titles.update(rating=average(F('score_sum'), F('reviews_count')))
+    return updated
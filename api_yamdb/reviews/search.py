@@ -0,0 +1,66 @@
+import re
+
+from django.db import connections, router
+
+from reviews.models import Title, TitleSearchIndex
+
+SEARCH_TABLE = TitleSearchIndex._meta.db_table
+MAX_SEARCH_TERMS = 10
+
+
+def get_search_connection():
+    return connections[router.db_for_write(Title)]
+
+
+def search_supported(connection=None):
+    """Полнотекстовый индекс FTS5 есть только в SQLite."""
+    connection = connection or get_search_connection()
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """
+    Превращает строку поиска в запрос FTS5: каждое слово ищется
+    по префиксу, все слова должны встретиться.
+    """
+    terms = re.findall(r'\w+', text or '')[:MAX_SEARCH_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def index_title(title):
+    connection = get_search_connection()
+    if not search_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [title.pk]
+        )
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, name, description) '
+            'VALUES (%s, %s, %s)',
+            [title.pk, title.name, title.description]
+        )
+
+
+def unindex_title(title_id):
+    connection = get_search_connection()
+    if not search_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [title_id]
+        )
+
+
+def rebuild_search_index():
+    """Заполняет индекс заново, например после массовой загрузки."""
+    connection = get_search_connection()
+    if not search_supported(connection):
+        return
+    title_table = Title._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, name, description) '
+            f'SELECT id, name, description FROM {title_table}'
+        )
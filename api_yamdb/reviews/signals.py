@@ -0,0 +1,163 @@
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_migrate, post_save, pre_delete
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reviews.catalog import (
+    schedule_invalidate, schedule_refresh, title_catalog
+)
+from reviews.leaderboards import (
+    add_new_title,
+    add_title_entries,
+    move_title_category,
+    remove_title_entries,
+    update_title_entries
+)
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from reviews.ratings import change_title_rating, rebuild_title_ratings
+from reviews.search import index_title, unindex_title
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, update_fields,
+                                 **kwargs):
+    """
+    Учитывает новый отзыв или изменение оценки в агрегатах. Прежнюю
+    оценку Review.save читает из БД в той же транзакции.
+    """
+    stored_score = getattr(instance, '_stored_score', None)
+    if created:
+        change_title_rating(instance.title_id, added=instance.score)
+        update_title_entries(instance.title_id, added_at=instance.pub_date)
+    elif update_fields is not None and 'score' not in update_fields:
+        return
+    elif stored_score is None:
+        rebuild_title_ratings(Title.objects.filter(pk=instance.title_id))
+        update_title_entries(instance.title_id)
+    elif stored_score != instance.score:
+        change_title_rating(
+            instance.title_id, added=instance.score, removed=stored_score
+        )
+        update_title_entries(instance.title_id)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    """Убирает удаленный отзыв из агрегатов, в том числе при каскаде."""
+    change_title_rating(instance.title_id, removed=instance.score)
+    update_title_entries(instance.title_id, removed_at=instance.pub_date)
+
+
+@receiver(post_save, sender=Title)
+def update_search_index_on_title_save(sender, instance, **kwargs):
+    """Переиндексирует название и описание произведения."""
+    index_title(instance)
+
+
+@receiver(post_delete, sender=Title)
+def update_search_index_on_title_delete(sender, instance, **kwargs):
+    unindex_title(instance.pk)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def update_catalog_on_title_change(sender, instance, **kwargs):
+    schedule_refresh([instance.pk])
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def update_catalog_on_genre_title_change(sender, instance, **kwargs):
+    schedule_refresh([instance.title_id])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_catalog_on_genres_set(sender, instance, action, reverse, pk_set,
+                                 **kwargs):
+    """Учитывает изменения жанров через `title.genre.set()` и т.п."""
+    if action in ('post_add', 'post_remove'):
+        schedule_refresh(pk_set if reverse else [instance.pk])
+    elif action == 'post_clear':
+        if reverse:
+            schedule_invalidate()
+        else:
+            schedule_refresh([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def update_catalog_slugs(sender, instance, **kwargs):
+    title_catalog.set_slug(sender, instance.pk, instance.slug)
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def rebuild_catalog_on_delete(sender, instance, **kwargs):
+    """Удаление категории обнуляет ее у произведений без сигналов."""
+    schedule_invalidate()
+
+
+@receiver(post_save, sender=Title)
+def update_leaderboards_on_title_save(sender, instance, created, **kwargs):
+    """Новое произведение попадает в рейтинг своей категории."""
+    if created:
+        add_new_title(instance)
+    elif (not hasattr(instance, '_loaded_category_id')
+          or instance._loaded_category_id != instance.category_id):
+        move_title_category(instance.pk, instance.category_id)
+    instance._loaded_category_id = instance.category_id
+
+
+@receiver(post_save, sender=GenreTitle)
+def update_leaderboards_on_genre_title_save(sender, instance, **kwargs):
+    add_title_entries('genre', instance.title_id, [instance.genre_id])
+
+
+@receiver(post_delete, sender=GenreTitle)
+def update_leaderboards_on_genre_title_delete(sender, instance, **kwargs):
+    remove_title_entries('genre', instance.title_id, [instance.genre_id])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_leaderboards_on_genres_set(sender, instance, action, reverse,
+                                      pk_set, **kwargs):
+    if action == 'post_clear':
+        if reverse:
+            instance.leaderboard.all().delete()
+        else:
+            remove_title_entries('genre', instance.pk)
+        return
+    if action not in ('post_add', 'post_remove'):
+        return
+    pairs = (
+        [(title_id, [instance.pk]) for title_id in pk_set] if reverse
+        else [(instance.pk, pk_set)]
+    )
+    for title_id, genre_ids in pairs:
+        if action == 'post_add':
+            add_title_entries('genre', title_id, genre_ids)
+        else:
+            remove_title_entries('genre', title_id, genre_ids)
+
+
+@receiver(post_migrate)
+def reset_catalog_after_migrate(sender, **kwargs):
+    title_catalog.invalidate()
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_titles_of_category(sender, instance, created=False, **kwargs):
+    """Вложенная категория входит в ответ, меняем дату произведений."""
+    if not created:
+        Title.objects.filter(category=instance).update(
+            modified=timezone.now()
+        )
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_titles_of_genre(sender, instance, created=False, **kwargs):
+    if not created:
+        Title.objects.filter(genre=instance).update(modified=timezone.now())
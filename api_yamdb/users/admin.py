@@ -2,7 +2,7 @@ from django.conf import settings
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib import admin
 
-from users.models import CustomUser
+from users.models import CustomUser, OutgoingEmail
 
 
 @admin.register(CustomUser)
@@ -16,3 +16,14 @@ class CustomUserAdmin(BaseUserAdmin):
     list_filter = ('username',)
     list_per_page = settings.PAGE_SIZE
     search_fields = ('username', 'role')
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Очередь исходящих писем."""
+
+    list_display = ('recipient', 'subject', 'created', 'attempts',
+                    'sent_at',)
+    list_filter = ('sent_at',)
+    list_per_page = settings.PAGE_SIZE
+    search_fields = ('recipient',)
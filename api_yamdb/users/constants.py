@@ -13,6 +13,9 @@ EMAIL_FIELD_LEN = 254
 CONFIRM_CODE_SIZE = 6
 """Длина кода подтверждения."""
 
+SIGNED_CODE_SIZE = 16
+"""Длина подписанного кода подтверждения (hex)."""
+
 USERNAME_REGEX = r'^[\w.@+-]+$'
 """Валидатор имени пользователя."""
 
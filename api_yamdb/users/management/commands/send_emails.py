@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.outbox import BATCH_SIZE, MAX_ATTEMPTS, process_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди: пачками, в несколько потоков, '
+        'с повтором неудачных попыток. Без --once работает постоянно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Писем в одной пачке.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Потоков отправки, у каждого свое соединение.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=MAX_ATTEMPTS,
+            help='Попыток отправки одного письма.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между проверками очереди, секунд.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить готовые письма и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = process_outbox(
+                options['batch_size'],
+                options['workers'],
+                options['max_attempts']
+            )
+            if sent or failed or options['once']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Отправлено: {sent}, ошибок: {failed}'
+                ))
+            if options['once']:
+                return
+            time.sleep(options['interval'])
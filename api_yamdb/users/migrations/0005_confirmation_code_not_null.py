@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='confirmation_code',
+            field=models.CharField(max_length=150, verbose_name='Код подтверждения'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.core.management.base import CommandError
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+# Django 3.2 не умеет уникальные ограничения и индексы по выражениям,
+# поэтому индексы по lower() создаются SQL-запросом и не попадают
+# в состояние миграций (см. CustomUser.Meta).
+INDEXES = (
+    ('users_customuser_username_lower_uniq', 'username'),
+    ('users_customuser_email_lower_uniq', 'email'),
+)
+
+
+def check_case_duplicates(apps, schema_editor):
+    """
+    Раньше имя и почта сравнивались с учетом регистра; совпадающие без
+    его учета записи не дадут создать индекс — перечисляем их заранее.
+    """
+    CustomUser = apps.get_model('users', 'CustomUser')
+    users = CustomUser.objects.using(schema_editor.connection.alias)
+    conflicts = []
+    for _, field in INDEXES:
+        values = users.annotate(value=Lower(field)).values('value').annotate(
+            total=Count('id')
+        ).filter(total__gt=1).values_list('value', flat=True)
+        for value in values:
+            duplicates = users.annotate(value=Lower(field)).filter(
+                value=value
+            ).order_by('id').values_list('id', field)
+            conflicts.append(f'{field} {value!r}: ' + ', '.join(
+                f'id={pk} {original!r}' for pk, original in duplicates
+            ))
+    if conflicts:
+        raise CommandError(
+            'Пользователи совпадают без учета регистра, переименуйте их '
+            'перед миграцией:\n' + '\n'.join(conflicts)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_confirmation_code_not_null'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        *(
+            migrations.RunSQL(
+                f'CREATE UNIQUE INDEX {name} '
+                f'ON users_customuser (LOWER({field}));',
+                f'DROP INDEX {name};'
+            )
+            for name, field in INDEXES
+        ),
+    ]
@@ -43,6 +43,11 @@ class CustomUser(AbstractUser):
     )
 
     class Meta:
+        # Имя и почта уникальны и без учета регистра: индексы по lower()
+        # созданы SQL-запросом в миграции 0006_case_insensitive_unique
+        # и не видны в состоянии миграций. AlterField полей модели
+        # на SQLite пересоздает таблицу и молча удаляет эти индексы —
+        # после такой миграции создайте их заново (см. test_24).
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
 
@@ -63,3 +68,35 @@ class CustomUser(AbstractUser):
     @property
     def is_user(self):
         return self.role == self.Roles.USER_ROLE
+
+
+class OutgoingEmail(models.Model):
+    """
+    Очередь исходящих писем. Письма отправляет обработчик
+    `send_emails`, неудачные попытки повторяются с нарастающей паузой.
+    Текст отправленного письма стирается.
+    """
+    subject = models.CharField('Тема', max_length=FIELD_DEFAULT_LEN)
+    body = models.TextField('Текст')
+    from_email = models.EmailField(
+        'Отправитель', max_length=EMAIL_FIELD_LEN, blank=True
+    )
+    recipient = models.EmailField('Получатель', max_length=EMAIL_FIELD_LEN)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    send_after = models.DateTimeField('Отправить после')
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            models.Index(
+                fields=('sent_at', 'send_after'),
+                name='outgoing_email_pending_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
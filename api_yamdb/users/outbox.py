@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_DELAY = timedelta(seconds=30)
+# Пока обработчик отправляет пачку, другие обработчики ее не берут.
+LEASE = timedelta(minutes=5)
+
+
+def delivers_inline():
+    """Бэкенды без сети (locmem, file, console) отправляют сразу."""
+    return settings.EMAIL_BACKEND in settings.EMAIL_OUTBOX_INLINE_BACKENDS
+
+
+def enqueue_email(subject, body, recipient, from_email=''):
+    """
+    Ставит письмо в очередь. При синхронном бэкенде письмо
+    отправляется после коммита транзакции, иначе — обработчиком.
+    """
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        recipient=recipient,
+        from_email=from_email,
+        send_after=timezone.now()
+    )
+    if delivers_inline():
+        transaction.on_commit(lambda: deliver([email]))
+    return email
+
+
+def get_retry_delay(attempts):
+    return RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def claim_batch(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """
+    Забирает пачку готовых к отправке писем: сдвигает их send_after
+    на время аренды, чтобы параллельный обработчик не взял их повторно.
+    """
+    now = timezone.now()
+    lease_until = now + LEASE
+    pending = OutgoingEmail.objects.filter(
+        sent_at__isnull=True, send_after__lte=now, attempts__lt=max_attempts
+    )
+    ids = list(
+        pending.order_by('send_after', 'id').values_list(
+            'id', flat=True
+        )[:batch_size]
+    )
+    pending.filter(id__in=ids).update(send_after=lease_until)
+    return list(OutgoingEmail.objects.filter(
+        id__in=ids, send_after=lease_until, sent_at__isnull=True
+    ))
+
+
+def send_chunk(emails):
+    """
+    Отправляет письма через одно соединение с почтовым сервером.
+    Возвращает пары (письмо, ошибка или None).
+    """
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        return [(email, repr(error)) for email in emails]
+    results = []
+    with connection:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email or None,
+                [email.recipient],
+                connection=connection
+            )
+            try:
+                message.send()
+            except Exception as error:
+                results.append((email, repr(error)))
+            else:
+                results.append((email, None))
+    return results
+
+
+def save_results(results):
+    """
+    Отмечает отправленные письма и стирает их текст (в нем коды
+    подтверждения), неудачным назначает следующую попытку.
+    """
+    now = timezone.now()
+    sent_ids = [email.id for email, error in results if error is None]
+    OutgoingEmail.objects.filter(id__in=sent_ids).update(
+        sent_at=now, body=''
+    )
+    failed = []
+    for email, error in results:
+        if error is not None:
+            email.attempts += 1
+            email.last_error = error
+            email.send_after = now + get_retry_delay(email.attempts)
+            failed.append(email)
+    OutgoingEmail.objects.bulk_update(
+        failed, ('attempts', 'last_error', 'send_after')
+    )
+    return len(sent_ids), len(failed)
+
+
+def deliver(emails, workers=1):
+    """
+    Отправляет письма в `workers` потоках, у каждого потока свое
+    соединение. Результаты записываются в базу из вызывающего потока.
+    Возвращает количество отправленных и неудачных писем.
+    """
+    if not emails:
+        return 0, 0
+    workers = max(1, min(workers, len(emails)))
+    chunks = [emails[index::workers] for index in range(workers)]
+    if workers == 1:
+        results = send_chunk(emails)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = [
+                result for chunk in executor.map(send_chunk, chunks)
+                for result in chunk
+            ]
+    return save_results(results)
+
+
+def process_outbox(batch_size=BATCH_SIZE, workers=1,
+                   max_attempts=MAX_ATTEMPTS):
+    """Отправляет все готовые письма пачками."""
+    sent = failed = 0
+    while True:
+        emails = claim_batch(batch_size, max_attempts)
+        if not emails:
+            return sent, failed
+        batch_sent, batch_failed = deliver(emails, workers)
+        sent += batch_sent
+        failed += batch_failed
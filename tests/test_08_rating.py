@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_review_writes(self, client, admin_client,
+                                             admin, user_client, user,
+                                             moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.reviews_count) == (15, 3), (
+            'Проверьте, что при создании отзыва обновляются сумма оценок '
+            'и количество отзывов произведения.'
+        )
+        assert self.get_rating(client, title_id) == 5
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(client, title_id) == 6, (
+            'Проверьте, что изменение оценки отзыва пересчитывает рейтинг.'
+        )
+
+        response = moderator_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count) == (13, 2), (
+            'Проверьте, что удаление отзыва пересчитывает рейтинг.'
+        )
+
+    def test_02_rating_follows_cascade_delete(self, client, admin_client,
+                                              user_client, user):
+        _, titles = create_reviews(admin_client, {})
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 9)
+        assert self.get_rating(client, title_id) == 9
+
+        user.delete()
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.reviews_count) == (0, 0), (
+            'Проверьте, что каскадное удаление отзывов вместе с автором '
+            'пересчитывает рейтинг.'
+        )
+        assert self.get_rating(client, title_id) is None
+
+    def test_03_rebuild_ratings_command(self, admin_client, user_client):
+        _, titles = create_reviews(admin_client, {})
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 7)
+        Review.objects.filter(title_id=title_id).update(score=3)
+        Title.objects.update(score_sum=0, reviews_count=0)
+
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.reviews_count) == (3, 1), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает '
+            'агрегаты оценок по таблице отзывов.'
+        )
+
+    def test_04_stale_title_save_keeps_aggregates(self, admin_client,
+                                                  user_client):
+        _, titles = create_reviews(admin_client, {})
+        title_id = titles[0]['id']
+        stale = Title.objects.get(pk=title_id)
+        create_single_review(user_client, title_id, 'Отзыв', 8)
+
+        stale.name = 'Новое название'
+        stale.save()
+        title = Title.objects.get(pk=title_id)
+        assert title.name == 'Новое название'
+        assert (title.score_sum, title.reviews_count, title.rating) == (
+            8, 1, 8
+        ), (
+            'Проверьте, что сохранение загруженного ранее произведения не '
+            'перезаписывает агрегаты отзывов устаревшими значениями.'
+        )
+        assert title.score_distribution[8] == 1
+
+    def test_05_stale_review_saves_keep_aggregates(self, admin_client,
+                                                   user_client):
+        _, titles = create_reviews(admin_client, {})
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 5)
+        first = Review.objects.get(title_id=title_id)
+        second = Review.objects.get(pk=first.pk)
+        first.score = 7
+        first.save()
+        second.score = 9
+        second.save()
+        second.score = 2
+        second.save()
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.reviews_count, title.rating) == (
+            2, 1, 2
+        ), (
+            'Проверьте, что изменение оценки загруженного ранее отзыва '
+            'учитывается от оценки, сохраненной в БД.'
+        )
+        assert title.score_distribution == {
+            score: int(score == 2) for score in title.score_distribution
+        }
+        first.delete()
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.reviews_count) == (0, 0), (
+            'Проверьте, что при удалении устаревшего отзыва из агрегатов '
+            'снимается оценка, сохраненная в БД.'
+        )
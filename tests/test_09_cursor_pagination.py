@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Review, Title
+from tests.utils import create_reviews
+
+
+def collect_pages(client, url):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` в режиме курсора '
+            'возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'В режиме курсора ответ не должен содержать ключ `count`.'
+        )
+        pages.append(data)
+        url = data['next']
+    return pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_titles_cursor_walk(self, client):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        for year in range(1990, 1997):
+            Title.objects.create(name='Дубль', year=year, category=category)
+        Title.objects.create(name='Альфа', year=2000, category=category)
+        expected = list(
+            Title.objects.order_by('name', 'id').values_list('id', flat=True)
+        )
+
+        pages = collect_pages(
+            client, f'{self.TITLES_URL}?pagination=cursor&limit=3'
+        )
+        ids = [title['id'] for page in pages for title in page['results']]
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` '
+            'возвращает все произведения по порядку (name, id) без пропусков '
+            'и повторов.'
+        )
+        assert pages[0]['previous'] is None
+
+        response = client.get(pages[-1]['previous'])
+        assert response.status_code == HTTPStatus.OK
+        assert [
+            title['id'] for title in response.json()['results']
+        ] == [title['id'] for title in pages[-2]['results']], (
+            'Проверьте, что ссылка `previous` в режиме курсора возвращает '
+            'предыдущую страницу.'
+        )
+
+    def test_02_reviews_cursor_walk(self, client, admin_client, admin,
+                                    user_client, user, moderator_client,
+                                    moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        _, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        Review.objects.filter(author=user).update(
+            pub_date=Review.objects.get(author=admin).pub_date
+        )
+        expected = list(
+            Review.objects.filter(title_id=title_id).order_by(
+                '-pub_date', '-id'
+            ).values_list('id', flat=True)
+        )
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        pages = collect_pages(client, f'{url}?pagination=cursor&limit=1')
+        ids = [review['id'] for page in pages for review in page['results']]
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация отзывов сохраняет порядок '
+            '(-pub_date, -id).'
+        )
+
+    def test_03_offset_pagination_kept(self, client):
+        Title.objects.create(name='Альфа', year=2000)
+        response = client.get(f'{self.TITLES_URL}?limit=1&offset=0')
+        data = response.json()
+        assert data['count'] == 1 and len(data['results']) == 1, (
+            'Проверьте, что пагинация по смещению продолжает работать.'
+        )
+
+    def test_04_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что некорректный курсор возвращает ответ со '
+            'статусом 404.'
+        )
@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}?search=` '
+            'возвращает ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_is_case_insensitive_for_cyrillic(self, client):
+        Title.objects.create(name='Побег из Шоушенка', year=1994)
+        Title.objects.create(name='Крестный отец', year=1972)
+
+        assert self.search(client, 'ШОУШЕНК') == ['Побег из Шоушенка'], (
+            'Проверьте, что поиск по названию не зависит от регистра '
+            'кириллицы и находит слово по префиксу.'
+        )
+        assert self.search(client, 'побег шоушенка') == [
+            'Побег из Шоушенка'
+        ]
+        assert self.search(client, 'побег отец') == [], (
+            'Проверьте, что поиск находит только произведения, '
+            'содержащие все слова запроса.'
+        )
+
+    def test_02_search_index_follows_title_changes(self, client):
+        title = Title.objects.create(
+            name='Мост', year=1957, description='Река Квай'
+        )
+        Title.objects.create(
+            name='Квай', year=2000, description='Квай, Квай и снова Квай'
+        )
+        assert self.search(client, 'квай') == ['Квай', 'Мост'], (
+            'Проверьте, что результаты поиска упорядочены по релевантности '
+            'и поиск идет также по описанию.'
+        )
+
+        title.description = 'Другое описание'
+        title.save()
+        assert self.search(client, 'квай') == ['Квай'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+
+        Title.objects.get(name='Квай').delete()
+        assert self.search(client, 'квай') == [], (
+            'Проверьте, что поисковый индекс обновляется при удалении '
+            'произведения.'
+        )
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.catalog import title_catalog
+from reviews.models import Category, Genre, GenreTitle, Title
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def catalog_index(settings):
+    settings.TITLE_CATALOG_INDEX = True
+    title_catalog.invalidate()
+    yield title_catalog
+    title_catalog.invalidate()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CatalogIndex:
+
+    TITLES_URL = '/api/v1/titles/'
+    FILTERS = (
+        {'genre': 'comedy'},
+        {'genre': 'drama,comedy'},
+        {'genre': 'o'},
+        {'genre_all': 'horror,comedy'},
+        {'genre_all': 'drama,comedy'},
+        {'category': 'films'},
+        {'category': 'book', 'year': 1988},
+        {'year': 1984},
+        {'year': 1984, 'genre': 'horror', 'limit': 1, 'offset': 0},
+    )
+
+    def get_ids(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        return data['count'], [title['id'] for title in data['results']]
+
+    def test_01_index_matches_database(self, client, admin_client,
+                                       settings, catalog_index):
+        create_titles(admin_client)
+        Title.objects.create(name='Без категории', year=1984)
+        for params in self.FILTERS:
+            settings.TITLE_CATALOG_INDEX = False
+            expected = self.get_ids(client, params)
+            settings.TITLE_CATALOG_INDEX = True
+            assert self.get_ids(client, params) == expected, (
+                'Проверьте, что индекс каталога возвращает те же '
+                f'произведения, что и БД, для фильтров {params}.'
+            )
+
+    def test_02_index_follows_changes(self, client, admin_client,
+                                      catalog_index):
+        titles, _, _ = create_titles(admin_client)
+        assert self.get_ids(client, {'genre': 'drama'})[0] == 1
+        drama = Genre.objects.get(slug='drama')
+
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            data={'genre': ['drama'], 'year': 1990}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_ids(client, {'genre': 'drama'})[0] == 2, (
+            'Проверьте, что индекс каталога обновляется при изменении '
+            'жанров произведения.'
+        )
+        assert self.get_ids(client, {'year': 1990})[0] == 1
+
+        GenreTitle.objects.filter(genre=drama).delete()
+        assert self.get_ids(client, {'genre': 'drama'})[0] == 0
+
+        Category.objects.filter(slug='films').delete()
+        assert self.get_ids(client, {'category': 'films'})[0] == 0, (
+            'Проверьте, что индекс каталога обновляется при удалении '
+            'категории.'
+        )
+
+    def test_03_updates_reuse_slots(self, client, admin_client,
+                                    catalog_index):
+        titles, _, _ = create_titles(admin_client)
+        self.get_ids(client, {'year': 1984})
+        size = len(catalog_index.ids)
+        for year in range(1990, 2010):
+            response = admin_client.patch(
+                f'{self.TITLES_URL}{titles[0]["id"]}/', data={'year': year}
+            )
+            assert response.status_code == HTTPStatus.OK
+        assert len(catalog_index.ids) == size, (
+            'Проверьте, что индекс каталога переиспользует слоты '
+            'измененных произведений.'
+        )
+        assert max(catalog_index.alive.bit_length(), 1) <= size
+        assert self.get_ids(client, {'year': 2009}) == (1, [titles[0]['id']])
+        assert self.get_ids(client, {'year': 1990})[0] == 0
@@ -0,0 +1,146 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache.backends.filebased import FileBasedCache
+
+from api import cache
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.fixture
+def response_cache(settings):
+    settings.RESPONSE_CACHE = True
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    CATEGORIES_URL = '/api/v1/categories/'
+    STATS_URL = '/api/v1/cache/stats/'
+
+    def test_01_repeated_get_is_served_from_cache(self, client,
+                                                  admin_client,
+                                                  response_cache):
+        create_titles(admin_client)
+        before = cache.get_stats()
+
+        first = client.get(f'{self.TITLES_URL}?limit=5&offset=0')
+        second = client.get(f'{self.TITLES_URL}?offset=0&limit=5')
+        assert first.status_code == second.status_code == HTTPStatus.OK
+        assert first.json() == second.json()
+
+        after = cache.get_stats()
+        assert after['misses'] == before['misses'] + 1, (
+            'Проверьте, что первый GET-запрос списка не берется из кэша.'
+        )
+        assert after['hits'] == before['hits'] + 1, (
+            'Проверьте, что повторный GET-запрос с тем же набором '
+            'параметров отдается из кэша.'
+        )
+
+    def test_02_writes_invalidate_dependent_lists(self, client, admin_client,
+                                                  user_client,
+                                                  response_cache):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        list_url = f'{self.TITLES_URL}?year={titles[0]["year"]}'
+        assert client.get(list_url).json()['results'][0]['rating'] is None
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        assert client.get(list_url).json()['results'][0]['rating'] == 7, (
+            'Проверьте, что создание отзыва сбрасывает кэш списка '
+            'произведений и рейтинг не устаревает.'
+        )
+        assert client.get(url).json()['rating'] == 7
+
+        count = client.get(self.CATEGORIES_URL).json()['count']
+        admin_client.post(
+            self.CATEGORIES_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        assert client.get(self.CATEGORIES_URL).json()['count'] == count + 1
+
+    def test_03_stats_are_admin_only(self, client, user_client,
+                                     admin_client):
+        assert client.get(self.STATS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        assert user_client.get(self.STATS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.get(self.STATS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert set(response.json()) == {'hits', 'misses'}
+
+    def test_04_disabled_by_default(self, client, admin_client):
+        create_titles(admin_client)
+        before = cache.get_stats()
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+        assert cache.get_stats() == before, (
+            'Проверьте, что без RESPONSE_CACHE ответы не кэшируются.'
+        )
+
+    def test_05_versions_shared_between_processes(self, client, settings,
+                                                  tmp_path, admin_client,
+                                                  user_client):
+        settings.CACHES = {
+            **settings.CACHES,
+            'responses': {
+                'BACKEND': (
+                    'django.core.cache.backends.filebased.FileBasedCache'
+                ),
+                'LOCATION': str(tmp_path),
+                'TIMEOUT': 60,
+            },
+        }
+        settings.RESPONSE_CACHE = True
+        titles, _, _ = create_titles(admin_client)
+        list_url = f'{self.TITLES_URL}?year={titles[0]["year"]}'
+        client.get(list_url)
+
+        # Кэш другого процесса: отдельный экземпляр бэкенда.
+        other = FileBasedCache(str(tmp_path), {'TIMEOUT': 60})
+        version = other.get(cache.VERSION_KEY.format('reviews'))
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        assert other.get(cache.VERSION_KEY.format('reviews')) not in (
+            version, None
+        ), (
+            'Проверьте, что версии ресурсов хранятся в общем кэше и '
+            'сброс виден другим процессам.'
+        )
+        assert client.get(list_url).json()['results'][0]['rating'] == 7
+
+    def test_06_user_writes_keep_titles_cached(self, client, admin_client,
+                                               user_client, response_cache):
+        create_titles(admin_client)
+        client.get(self.TITLES_URL)
+        response = user_client.patch('/api/v1/users/me/', data={'bio': 'Я'})
+        assert response.status_code == HTTPStatus.OK
+        before = cache.get_stats()
+        client.get(self.TITLES_URL)
+        assert cache.get_stats()['hits'] == before['hits'] + 1, (
+            'Проверьте, что изменение профиля пользователя не сбрасывает '
+            'кэш списка произведений.'
+        )
+
+    def test_07_evicted_version_misses(self, client, admin_client,
+                                       response_cache):
+        create_titles(admin_client)
+        keys = [
+            cache.VERSION_KEY.format(resource)
+            for resource in ('titles', 'categories', 'genres', 'reviews')
+        ]
+        cache.get_cache().delete_many(keys)
+        client.get(self.TITLES_URL)
+        cache.bump_versions(('titles',))
+        cache.get_cache().delete_many(keys)
+        before = cache.get_stats()
+        client.get(self.TITLES_URL)
+        assert cache.get_stats()['misses'] == before['misses'] + 1, (
+            'Проверьте, что после вытеснения версий из кэша ответ, '
+            'сохраненный до сброса, не отдается.'
+        )
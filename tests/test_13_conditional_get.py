@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert 'ETag' in response and 'Last-Modified' in response, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        etag = response['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert response['ETag'] == etag
+        return etag
+
+    def test_01_titles(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        list_etag = self.check_not_modified(client, self.TITLES_URL)
+        detail_etag = self.check_not_modified(client, detail_url)
+
+        response = client.get(
+            detail_url,
+            HTTP_IF_MODIFIED_SINCE=client.get(detail_url)['Last-Modified']
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 6)
+        for url, etag in ((self.TITLES_URL, list_etag),
+                          (detail_url, detail_etag)):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что после изменения рейтинга GET-запрос к '
+                f'`{url}` со старым `ETag` возвращает новые данные.'
+            )
+
+    def test_02_reviews_and_comments(self, client, admin_client, admin,
+                                     user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        reviews_etag = self.check_not_modified(client, reviews_url)
+        comments_etag = self.check_not_modified(client, comments_url)
+
+        response = user_client.patch(
+            f'{comments_url}{comments[1]["id"]}/', data={'text': 'Новый'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение комментария меняет `ETag` списка.'
+        )
+
+        response = user_client.delete(f'{reviews_url}{reviews[1]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что удаление отзыва меняет `ETag` списка.'
+        )
+
+    def test_03_invalid_id(self, client, admin_client, admin, user_client,
+                           user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        for url in (self.TITLES_URL, reviews_url, comments_url):
+            response = client.get(f'{url}abc/')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET-запрос к `{url}<id>/` с нечисловым '
+                'id возвращает ответ со статусом 404.'
+            )
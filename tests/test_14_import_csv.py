@@ -0,0 +1,93 @@
+import csv
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Comment, GenreTitle, Review, Title
+from users.models import CustomUser
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb/static/data'
+
+
+def count_rows(filename, path=DATA_DIR):
+    with open(path / filename, encoding='utf-8', newline='') as csv_file:
+        return sum(1 for _ in csv.DictReader(csv_file))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    path = tmp_path / 'data'
+    shutil.copytree(DATA_DIR, path)
+    return path
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ImportCsv:
+
+    def test_01_import_all_datasets(self, client, data_dir):
+        call_command(
+            'import_csv', path=str(data_dir), chunk_size=7, stdout=None
+        )
+        assert CustomUser.objects.count() == count_rows('users.csv')
+        assert Title.objects.count() == count_rows('titles.csv')
+        assert GenreTitle.objects.count() == count_rows('genre_title.csv')
+        assert Review.objects.count() == count_rows('review.csv')
+        assert Comment.objects.count() == count_rows('comments.csv')
+        assert not (data_dir / '.import_checkpoint.json').exists()
+
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что импорт сохраняет дату публикации из файла.'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        assert title.reviews_count == title.reviews.count(), (
+            'Проверьте, что после импорта пересчитывается рейтинг.'
+        )
+        response = client.get('/api/v1/titles/', {'search': title.name})
+        assert title.id in [item['id'] for item in response.json()['results']]
+
+    def test_02_resume_after_failure(self, data_dir):
+        comments = data_dir / 'comments.csv'
+        original = comments.read_text(encoding='utf-8')
+        comments.write_text(
+            original.rstrip('\n') + '\n999,100500,Текст,100,'
+            '2019-09-24T21:08:21.567Z\n', encoding='utf-8'
+        )
+        with pytest.raises(CommandError):
+            call_command('import_csv', path=str(data_dir), chunk_size=10)
+        checkpoint = json.loads(
+            (data_dir / '.import_checkpoint.json').read_text()
+        )
+        assert checkpoint['review.csv'] == count_rows('review.csv')
+        assert Comment.objects.count() == 0
+
+        comments.write_text(original, encoding='utf-8')
+        checkpoint['review.csv'] -= 5
+        (data_dir / '.import_checkpoint.json').write_text(
+            json.dumps(checkpoint)
+        )
+        call_command(
+            'import_csv', path=str(data_dir), chunk_size=10, resume=True
+        )
+        assert Review.objects.count() == count_rows('review.csv'), (
+            'Проверьте, что повторная загрузка порции не создает дубликатов.'
+        )
+        assert Comment.objects.count() == count_rows('comments.csv')
+
+    def test_03_import_with_workers(self, data_dir):
+        call_command(
+            'import_csv', path=str(data_dir), chunk_size=20, workers=2
+        )
+        assert Review.objects.count() == count_rows('review.csv')
+
+    def test_04_invalid_row(self, data_dir):
+        titles = data_dir / 'titles.csv'
+        titles.write_text(
+            titles.read_text(encoding='utf-8').rstrip('\n')
+            + '\n1000,Новое,не год,1\n', encoding='utf-8'
+        )
+        with pytest.raises(CommandError, match='titles.csv'):
+            call_command('import_csv', path=str(data_dir))
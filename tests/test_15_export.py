@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+
+from api import export
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Export:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/export/{resource}/'
+
+    def get_export(self, client, resource, output='ndjson'):
+        response = client.get(
+            self.EXPORT_URL_TEMPLATE.format(resource=resource),
+            {'output': output}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдается потоковым ответом.'
+        )
+        return b''.join(response.streaming_content).decode()
+
+    def test_01_export_is_admin_only(self, client, user_client,
+                                     moderator_client):
+        url = self.EXPORT_URL_TEMPLATE.format(resource='titles')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        for role_client in (user_client, moderator_client):
+            assert role_client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+    def test_02_ndjson(self, admin_client, admin, user_client, user,
+                       moderator_client, moderator, monkeypatch):
+        monkeypatch.setattr(export, 'CHUNK_SIZE', 1)
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+
+        lines = self.get_export(admin_client, 'titles').splitlines()
+        exported = [json.loads(line) for line in lines]
+        assert [title['id'] for title in exported] == sorted(
+            title['id'] for title in titles
+        )
+        first = next(
+            title for title in exported if title['id'] == titles[0]['id']
+        )
+        assert first['category'] == titles[0]['category']
+        assert first['genre'] == sorted(titles[0]['genre'])
+        assert first['rating'] == 5
+        assert first['reviews_count'] == len(reviews)
+
+        exported = [
+            json.loads(line)
+            for line in self.get_export(admin_client, 'reviews').splitlines()
+        ]
+        assert {review['author'] for review in exported} == {
+            review['author'] for review in reviews
+        }, 'Проверьте, что в выгрузке отзывов указан username автора.'
+        assert exported[0]['title_id'] == titles[0]['id']
+
+        exported = [
+            json.loads(line)
+            for line in self.get_export(admin_client, 'comments').splitlines()
+        ]
+        assert [comment['text'] for comment in exported] == [
+            comment['text'] for comment in comments
+        ]
+        assert exported[0]['review_id'] == reviews[0]['id']
+
+    def test_03_csv(self, admin_client, admin):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        content = self.get_export(admin_client, 'titles', 'csv')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert len(rows) == len(titles)
+        assert set(rows[0]) == set(export.TITLE_FIELDS)
+        assert rows[0]['genre'] == ','.join(sorted(titles[0]['genre']))
+
+        rows = list(csv.DictReader(io.StringIO(
+            self.get_export(admin_client, 'reviews', 'csv')
+        )))
+        assert rows[0]['author'] == admin.username
+
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(resource='titles'),
+            {'output': 'xml'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
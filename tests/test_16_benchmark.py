@@ -0,0 +1,43 @@
+import pytest
+
+from api.benchmark import (
+    SCENARIOS,
+    percentile,
+    run_benchmark,
+    seed_dataset
+)
+from reviews.models import Review, Title
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 95) == 3.0
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Benchmark:
+
+    def test_01_seed_dataset(self):
+        seed_dataset(120)
+        assert Review.objects.count() == 120
+        title = Title.objects.order_by('id').first()
+        assert title.reviews_count == title.reviews.count(), (
+            'Проверьте, что после заполнения БД пересчитывается рейтинг.'
+        )
+
+    def test_02_all_scenarios_succeed(self):
+        seed_dataset(30)
+        report = run_benchmark(iterations=2)
+        assert list(report) == [scenario[0] for scenario in SCENARIOS]
+        for name, result in report.items():
+            assert result['requests'] == 2
+            for status in result['statuses']:
+                assert 200 <= int(status) < 300, (
+                    f'Сценарий `{name}` завершился со статусом {status}.'
+                )
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+            if name != 'cache-stats':
+                # Статистика кэша и аутентификация обходятся без SQL.
+                assert result['queries_max'] > 0
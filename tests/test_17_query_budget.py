@@ -0,0 +1,83 @@
+import logging
+
+import pytest
+from django.test import Client
+
+from api.benchmark import SCENARIOS, run_benchmark, seed_dataset
+from api.views import TitleViewSet
+from reviews.models import Comment, Review, Title
+from tests.utils import check_query_budget, get_url_budget
+
+# Пакетные сценарии и сценарии их вложенных запросов.
+BATCH_SCENARIOS = {
+    'batch-title-page': ('titles-retrieve', 'reviews-list', 'comments-list'),
+}
+
+
+@pytest.fixture
+def dataset(user):
+    seed_dataset(100)
+    review = Review.objects.order_by('id').first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=user, text=f'Комментарий {number}')
+        for number in range(25)
+    )
+    return review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17QueryBudget:
+
+    def test_01_lists_do_not_grow_with_page(self, dataset, admin_client,
+                                            client):
+        review = dataset
+        title_id = review.title_id
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?pagination=cursor',
+            '/api/v1/titles/?search=Произведение',
+            '/api/v1/titles/?genre=bench-genre-1',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{review.id}/comments/',
+        )
+        for url in urls:
+            check_query_budget(client, url)
+            check_query_budget(admin_client, url)
+        check_query_budget(admin_client, '/api/v1/users/')
+
+    def test_02_all_actions_within_budget(self, dataset):
+        report = run_benchmark(iterations=1)
+        assert len(report) == len(SCENARIOS)
+        for name, result in report.items():
+            if name in BATCH_SCENARIOS:
+                # Пакет укладывается в сумму бюджетов вложенных запросов.
+                action = 'batch'
+                budget = sum(
+                    get_url_budget('get', report[part]['path'])[1]
+                    for part in BATCH_SCENARIOS[name]
+                )
+            else:
+                action, budget = get_url_budget(
+                    result['method'], result['path']
+                )
+            assert result['queries_max'] <= budget, (
+                f'Проверьте бюджет SQL-запросов сценария `{name}` '
+                f'({action}): {result["queries_max"]} из {budget}.'
+            )
+
+    def test_03_debug_middleware_logs_overrun(self, dataset, settings,
+                                              monkeypatch, caplog):
+        settings.DEBUG = True
+        monkeypatch.setattr(TitleViewSet, 'query_budget', {'list': 1})
+        title = Title.objects.first()
+        with caplog.at_level(logging.WARNING, logger='api.query_budget'):
+            Client().get(f'/api/v1/titles/{title.id}/')
+            assert not caplog.records
+            Client().get('/api/v1/titles/')
+        assert len(caplog.records) == 1, (
+            'Проверьте, что в режиме DEBUG запросы сверх бюджета '
+            'попадают в лог.'
+        )
+        assert 'list' in caplog.records[0].getMessage()
@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ScoreDistribution:
+
+    URL_TEMPLATE = '/api/v1/titles/{title_id}/score-distribution/'
+
+    def get_distribution(self, client, title_id):
+        response = client.get(self.URL_TEMPLATE.format(title_id=title_id))
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос к '
+            '`/api/v1/titles/{title_id}/score-distribution/` возвращает '
+            'ответ со статусом 200.'
+        )
+        return response.json()
+
+    def test_01_distribution_follows_reviews(self, client, admin_client,
+                                             user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        data = self.get_distribution(client, title_id)
+        assert data == {
+            'id': title_id,
+            'rating': None,
+            'reviews_count': 0,
+            'distribution': {str(score): 0 for score in range(1, 11)}
+        }
+
+        create_single_review(user_client, title_id, 'Отзыв', 3)
+        review = create_single_review(
+            moderator_client, title_id, 'Отзыв', 9
+        ).json()
+        create_single_review(admin_client, title_id, 'Отзыв', 9)
+        distribution = self.get_distribution(client, title_id)['distribution']
+        assert (distribution['3'], distribution['9']) == (1, 2), (
+            'Проверьте, что при создании отзыва увеличивается счетчик '
+            'его оценки.'
+        )
+
+        moderator_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 10}
+        )
+        distribution = self.get_distribution(client, title_id)['distribution']
+        assert (distribution['9'], distribution['10']) == (1, 1), (
+            'Проверьте, что при изменении оценки счетчики обновляются.'
+        )
+
+        admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        )
+        data = self.get_distribution(client, title_id)
+        assert data['distribution']['10'] == 0
+        assert data['reviews_count'] == 2
+        assert sum(data['distribution'].values()) == 2
+
+    def test_02_single_row_read(self, client, admin_client, user_client,
+                                django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 5)
+        with django_assert_num_queries(1):
+            self.get_distribution(client, titles[0]['id'])
+        for title_id in (100500, 'abc'):
+            response = client.get(self.URL_TEMPLATE.format(title_id=title_id))
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что запрос распределения оценок '
+                'несуществующего произведения возвращает ответ со '
+                'статусом 404.'
+            )
+
+    def test_03_rebuild_restores_counters(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 4)
+        Title.objects.update(score_4_count=0, reviews_count=0)
+        Review.objects.update(score=6)
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.score_distribution[6] == 1
+        assert title.score_distribution[4] == 0
+
+    def test_04_stale_review_keeps_counters(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 5)
+        stale = Review.objects.get()
+        fresh = Review.objects.get()
+        fresh.score = 7
+        fresh.save()
+        stale.score = 3
+        stale.save()
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.score_distribution == {
+            score: int(score == 3) for score in title.score_distribution
+        }, (
+            'Проверьте, что повторное сохранение устаревшего отзыва не '
+            'уводит счетчики распределения оценок в минус.'
+        )
@@ -0,0 +1,137 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import (
+    CategoryLeaderboardEntry,
+    GenreLeaderboardEntry,
+    Review
+)
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.fixture
+def titles(admin_client):
+    titles, _, _ = create_titles(admin_client)
+    response = admin_client.post('/api/v1/titles/', data={
+        'name': 'Назад в будущее',
+        'year': 1985,
+        'genre': ['comedy'],
+        'category': 'films'
+    })
+    assert response.status_code == HTTPStatus.CREATED
+    return [title['id'] for title in titles] + [response.json()['id']]
+
+
+def get_ids(client, url, params=None):
+    response = client.get(url, params)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+        'статусом 200.'
+    )
+    return [title['id'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Leaderboards:
+
+    def test_01_top_rated(self, client, titles, user_client,
+                          moderator_client, admin_client):
+        terminator, _, back_to_future = titles
+        create_single_review(user_client, terminator, 'Отзыв', 6)
+        create_single_review(moderator_client, terminator, 'Отзыв', 8)
+        create_single_review(user_client, back_to_future, 'Отзыв', 9)
+
+        url = '/api/v1/categories/films/top-rated/'
+        assert get_ids(client, url, {'min_reviews': 1}) == [
+            back_to_future, terminator
+        ], (
+            'Проверьте, что рейтинг категории упорядочен по средней '
+            'оценке.'
+        )
+        assert get_ids(client, url, {'min_reviews': 2}) == [terminator], (
+            'Проверьте, что параметр `min_reviews` отсекает произведения '
+            'с малым числом отзывов.'
+        )
+        create_single_review(moderator_client, back_to_future, 'Отзыв', 1)
+        assert get_ids(client, url, {'min_reviews': 2}) == [
+            terminator, back_to_future
+        ]
+        assert get_ids(
+            client, '/api/v1/genres/comedy/top-rated/', {'min_reviews': 1}
+        ) == [terminator, back_to_future]
+
+        assert client.get(
+            url, {'min_reviews': 'много'}
+        ).status_code == HTTPStatus.BAD_REQUEST
+        assert client.get(
+            '/api/v1/categories/unknown/top-rated/'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_trending(self, client, titles, user_client,
+                         moderator_client, admin_client):
+        terminator, _, back_to_future = titles
+        url = '/api/v1/categories/films/trending/'
+        assert get_ids(client, url) == []
+        create_single_review(user_client, back_to_future, 'Отзыв', 5)
+        create_single_review(user_client, terminator, 'Отзыв', 5)
+        review = create_single_review(
+            moderator_client, terminator, 'Отзыв', 5
+        ).json()
+        assert get_ids(client, url) == [terminator, back_to_future], (
+            'Проверьте, что в трендах выше произведения с большей '
+            'активностью отзывов.'
+        )
+        admin_client.delete(
+            f'/api/v1/titles/{terminator}/reviews/{review["id"]}/'
+        )
+        Review.objects.filter(title_id=back_to_future).update(
+            pub_date=timezone.now() + timedelta(hours=1)
+        )
+        call_command('compact_leaderboards')
+        assert get_ids(client, url) == [back_to_future, terminator]
+
+        Review.objects.update(pub_date=timezone.now() - timedelta(days=30))
+        call_command('compact_leaderboards')
+        assert get_ids(client, url) == [], (
+            'Проверьте, что компактизация убирает из трендов старые отзывы.'
+        )
+
+    def test_03_membership_follows_title(self, client, titles, admin_client,
+                                         user_client):
+        terminator, die_hard, _ = titles
+        create_single_review(user_client, die_hard, 'Отзыв', 7)
+        assert get_ids(
+            client, '/api/v1/categories/books/top-rated/', {'min_reviews': 1}
+        ) == [die_hard]
+        response = admin_client.patch(
+            f'/api/v1/titles/{die_hard}/',
+            data={'category': 'films', 'genre': ['comedy']}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert get_ids(
+            client, '/api/v1/categories/books/top-rated/', {'min_reviews': 1}
+        ) == []
+        assert die_hard in get_ids(
+            client, '/api/v1/categories/films/top-rated/', {'min_reviews': 1}
+        ), 'Проверьте, что рейтинги следуют за категорией произведения.'
+        assert die_hard in get_ids(client, '/api/v1/genres/comedy/trending/')
+        assert get_ids(client, '/api/v1/genres/drama/trending/') == []
+
+        incremental = {
+            model: sorted(model.objects.values_list(
+                'title_id', 'reviews_count', 'rating'
+            ))
+            for model in (CategoryLeaderboardEntry, GenreLeaderboardEntry)
+        }
+        call_command('compact_leaderboards')
+        for model, entries in incremental.items():
+            assert sorted(model.objects.values_list(
+                'title_id', 'reviews_count', 'rating'
+            )) == entries, (
+                'Проверьте, что инкрементальные рейтинги совпадают с '
+                'пересчитанными.'
+            )
@@ -0,0 +1,99 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.benchmark import seed_dataset
+from tests.utils import (
+    create_single_review,
+    create_titles,
+    get_query_plans
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TitleOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+    ORDERINGS = ('name', 'year', 'rating', 'id')
+    FILTERS = ('', 'year=1905&', 'category=bench-category-1&', 'name=1&')
+
+    def get_titles(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['results']
+
+    def test_01_ordering(self, client, admin_client, user_client,
+                         moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        terminator, die_hard = titles
+        create_single_review(user_client, terminator['id'], 'Отзыв', 4)
+        create_single_review(user_client, die_hard['id'], 'Отзыв', 9)
+
+        for ordering, expected in (
+            ('name', [die_hard, terminator]),
+            ('-name', [terminator, die_hard]),
+            ('year', [terminator, die_hard]),
+            ('-year', [die_hard, terminator]),
+            ('rating', [terminator, die_hard]),
+            ('-rating', [die_hard, terminator]),
+            ('-id', [die_hard, terminator]),
+        ):
+            results = self.get_titles(client, {'ordering': ordering})
+            assert [title['id'] for title in results] == [
+                title['id'] for title in expected
+            ], (
+                'Проверьте, что список произведений сортируется параметром '
+                f'`ordering={ordering}`.'
+            )
+        results = self.get_titles(
+            client, {'ordering': '-rating', 'category': 'films'}
+        )
+        assert [title['id'] for title in results] == [terminator['id']]
+        assert results[0]['rating'] == 4
+
+        results = self.get_titles(client, {'ordering': 'pub_date'})
+        assert len(results) == 2
+
+    def test_02_cursor_follows_ordering(self, client):
+        seed_dataset(100)
+        expected = [
+            title['id'] for title in self.get_titles(
+                client, {'ordering': '-rating', 'limit': 10}
+            )
+        ]
+        response = client.get(self.TITLES_URL, {
+            'ordering': '-rating', 'pagination': 'cursor', 'limit': 4
+        })
+        ids = [title['id'] for title in response.json()['results']]
+        while response.json()['next'] and len(ids) < 10:
+            response = client.get(response.json()['next'])
+            ids += [title['id'] for title in response.json()['results']]
+        assert ids[:10] == expected, (
+            'Проверьте, что курсорная пагинация следует параметру '
+            '`ordering`.'
+        )
+
+    def test_03_orderings_use_indexes(self, client):
+        seed_dataset(300)
+        for filters in self.FILTERS:
+            for field in self.ORDERINGS:
+                for ordering in (field, f'-{field}'):
+                    url = f'{self.TITLES_URL}?{filters}ordering={ordering}'
+                    for plan in get_query_plans(client, url, 'reviews_title'):
+                        assert not any(
+                            'TEMP B-TREE' in step for step in plan
+                        ), (
+                            f'Проверьте, что для `{url}` сортировка '
+                            f'обслуживается индексом. План: {plan}'
+                        )
+
+    def test_04_genre_filter_reads_subset(self, client):
+        seed_dataset(300)
+        url = f'{self.TITLES_URL}?genre=bench-genre-1&ordering=-rating'
+        for plan in get_query_plans(client, url, 'reviews_title'):
+            assert not any(
+                step.startswith('SCAN reviews_title') for step in plan
+            ), (
+                'Проверьте, что при фильтре по жанру произведения читаются '
+                f'по ключу, а не полным просмотром. План: {plan}'
+            )
@@ -0,0 +1,66 @@
+import pytest
+
+from api.benchmark import seed_dataset
+from reviews.models import Comment, Review
+from tests.utils import get_query_plans
+
+
+def check_plan(url, plan):
+    for step in plan:
+        assert 'TEMP B-TREE' not in step, (
+            f'Проверьте, что список `{url}` упорядочен по индексу, а не '
+            f'сортировкой во временном B-дереве. План: {plan}'
+        )
+        assert not (step.startswith('SCAN ') and 'USING' not in step), (
+            f'Проверьте, что список `{url}` не читает таблицу полным '
+            f'просмотром. План: {plan}'
+        )
+
+
+@pytest.fixture
+def review():
+    seed_dataset(300)
+    return Review.objects.filter(
+        id__in=Comment.objects.values('review_id')
+    ).first()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21QueryPlans:
+
+    def test_01_list_queries_use_indexes(self, client, admin_client,
+                                         review):
+        reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        lists = (
+            (client, '/api/v1/titles/', 'reviews_title'),
+            (client, '/api/v1/categories/', 'reviews_category'),
+            (client, '/api/v1/genres/', 'reviews_genre'),
+            (admin_client, '/api/v1/users/', 'users_customuser'),
+            (client, reviews_url, 'reviews_review'),
+            (client, comments_url, 'reviews_comment'),
+            (
+                client, '/api/v1/categories/bench-category-1/top-rated/',
+                'reviews_categoryleaderboardentry'
+            ),
+            (
+                client, '/api/v1/genres/bench-genre-1/trending/',
+                'reviews_genreleaderboardentry'
+            ),
+        )
+        for list_client, url, table in lists:
+            for mode in ('', '?pagination=cursor'):
+                if 'leaderboard' in table and mode:
+                    continue
+                for plan in get_query_plans(list_client, url + mode, table):
+                    check_plan(url + mode, plan)
+
+    def test_02_genre_filter_uses_genre_title_index(self, client, review):
+        url = '/api/v1/titles/?genre=bench-genre-1'
+        for plan in get_query_plans(client, url, 'reviews_title'):
+            assert any(
+                'genre_title_genre_idx' in step for step in plan
+            ), (
+                'Проверьте, что фильтр по жанру читает связи жанров и '
+                f'произведений по индексу (genre, title). План: {plan}'
+            )
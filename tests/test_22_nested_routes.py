@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Review, Title
+
+
+@pytest.fixture
+def chain(admin, user):
+    category = Category.objects.create(name='Книги', slug='books')
+    first, second = (
+        Title.objects.create(name=name, year=2000, category=category)
+        for name in ('Первое', 'Второе')
+    )
+    review = Review.objects.create(
+        title=first, author=user, text='Отзыв', score=8
+    )
+    Review.objects.create(title=second, author=user, text='Отзыв', score=5)
+    comment = Comment.objects.create(review=review, author=user, text='Текст')
+    return first, second, review, comment
+
+
+def count_table_queries(context, table):
+    return sum(
+        f'FROM "{table}"' in query['sql'] for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22NestedRoutes:
+
+    def test_01_mismatched_chain_not_found(self, user_client, chain):
+        first, second, review, comment = chain
+        url = f'/api/v1/titles/{second.id}/reviews/{review.id}/comments/'
+        requests = (
+            ('get', url, None),
+            ('post', url, {'text': 'Чужой отзыв'}),
+            ('get', f'{url}{comment.id}/', None),
+            ('patch', f'{url}{comment.id}/', {'text': 'Правка'}),
+            ('delete', f'{url}{comment.id}/', None),
+            ('get', f'/api/v1/titles/{second.id}/reviews/{review.id}/', None),
+        )
+        for method, request_url, data in requests:
+            response = getattr(user_client, method)(
+                request_url, data=data, format='json'
+            )
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что {method.upper()}-запрос к `{request_url}`, '
+                'где отзыв не принадлежит произведению, возвращает ответ '
+                'со статусом 404.'
+            )
+        assert Comment.objects.count() == 1, (
+            'Проверьте, что к отзыву нельзя добавить комментарий через '
+            'чужое произведение.'
+        )
+        assert Comment.objects.get().text == 'Текст'
+
+    def test_02_parent_resolved_once(self, user_client, chain):
+        first, second, review, comment = chain
+        url = f'/api/v1/titles/{first.id}/reviews/{review.id}/comments/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert count_table_queries(context, 'reviews_review') == 1, (
+            'Проверьте, что цепочка произведение -> отзыв проверяется одним '
+            'запросом и не повторяется для выборки комментариев.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Еще'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert count_table_queries(context, 'reviews_review') == 1, (
+            'Проверьте, что при создании комментария отзыв загружается '
+            'одним запросом вместе с проверкой произведения.'
+        )
+
+    def test_03_detail_checks_chain_in_object_query(self, user_client,
+                                                     chain):
+        first, second, review, comment = chain
+        url = (
+            f'/api/v1/titles/{first.id}/reviews/{review.id}/comments/'
+            f'{comment.id}/'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert count_table_queries(context, 'reviews_review') == 0, (
+            'Проверьте, что комментарий выбирается вместе с проверкой '
+            'цепочки, без отдельного запроса отзыва.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(
+                f'/api/v1/titles/{first.id}/reviews/{review.id}/'
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert count_table_queries(context, 'reviews_title') == 0, (
+            'Проверьте, что отзыв выбирается без отдельного запроса '
+            'произведения.'
+        )
@@ -0,0 +1,111 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.management import call_command
+from django.utils import timezone
+
+from users import outbox
+from users.models import OutgoingEmail
+
+
+@pytest.fixture
+def queued(settings):
+    settings.EMAIL_OUTBOX_INLINE_BACKENDS = ()
+
+
+def enqueue(count):
+    return [
+        outbox.enqueue_email('Тема', f'Письмо {number}', f'{number}@yamdb.fake')
+        for number in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23EmailOutbox:
+
+    def test_01_signup_only_enqueues(self, client, queued):
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid-username'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert not mail.outbox, (
+            'Проверьте, что при регистрации письмо не отправляется сразу, '
+            'а ставится в очередь.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == data['email']
+        assert email.sent_at is None
+
+        call_command('send_emails', '--once')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что команда `send_emails` отправляет письма '
+            'из очереди.'
+        )
+        assert mail.outbox[0].to == [data['email']]
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        assert email.body == '', (
+            'Проверьте, что текст отправленного письма с кодом '
+            'подтверждения не хранится в очереди.'
+        )
+
+    def test_02_inline_backend_sends_on_signup(self, client):
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid-username'}
+        client.post('/api/v1/auth/signup/', data=data)
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что с бэкендом locmem письмо отправляется сразу.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is not None
+        assert email.body == ''
+
+    def test_03_retry_with_backoff(self, queued, monkeypatch):
+        email, = enqueue(1)
+
+        def fail(message):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr(EmailMessage, 'send', fail)
+        assert outbox.process_outbox() == (0, 1)
+        email.refresh_from_db()
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.send_after > timezone.now(), (
+            'Проверьте, что неудачная отправка откладывается.'
+        )
+        assert outbox.process_outbox() == (0, 0), (
+            'Проверьте, что письмо не отправляется повторно до конца паузы.'
+        )
+        monkeypatch.undo()
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        assert outbox.process_outbox() == (1, 0)
+        assert len(mail.outbox) == 1
+        assert outbox.get_retry_delay(3) == outbox.RETRY_DELAY * 4
+
+    def test_04_gives_up_after_max_attempts(self, queued):
+        enqueue(1)
+        OutgoingEmail.objects.update(attempts=outbox.MAX_ATTEMPTS)
+        assert outbox.process_outbox() == (0, 0)
+        assert not mail.outbox
+
+    def test_05_batches_reuse_connections(self, queued, monkeypatch):
+        enqueue(10)
+        opened = []
+        get_connection = outbox.get_connection
+
+        def counting_connection():
+            opened.append(True)
+            return get_connection()
+
+        monkeypatch.setattr(outbox, 'get_connection', counting_connection)
+        assert outbox.process_outbox(batch_size=4, workers=2) == (10, 0)
+        assert len(mail.outbox) == 10
+        assert sorted(message.to[0] for message in mail.outbox) == sorted(
+            OutgoingEmail.objects.values_list('recipient', flat=True)
+        ), 'Проверьте, что каждое письмо отправляется один раз.'
+        assert len(opened) == 6, (
+            'Проверьте, что каждый поток отправляет свою часть пачки '
+            'через одно соединение.'
+        )
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
@@ -0,0 +1,129 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from api import views
+from users.models import CustomUser
+
+INDEXES = (
+    'users_customuser_username_lower_uniq',
+    'users_customuser_email_lower_uniq',
+)
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+VALID_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+
+def count_user_queries(context):
+    return sum(
+        '"users_customuser"' in query['sql']
+        for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SignupQueries:
+
+    def test_01_signup_round_trips(self, client):
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as context:
+                response = client.post(URL_SIGNUP, data=VALID_DATA)
+            assert response.status_code == HTTPStatus.OK
+            assert count_user_queries(context) <= 2, (
+                'Проверьте, что регистрация и повторный запрос кода '
+                'выполняют не больше двух запросов к таблице пользователей.'
+            )
+        assert len(mail.outbox) == 2
+        user = CustomUser.objects.get()
+        assert user.confirmation_code in mail.outbox[-1].body, (
+            'Проверьте, что в письме указан код, сохраненный пользователю.'
+        )
+
+    def test_02_case_insensitive_duplicates(self, client):
+        client.post(URL_SIGNUP, data=VALID_DATA)
+        cases = (
+            (
+                {'email': 'VALID@yamdb.fake', 'username': 'other'},
+                'E-mail уже существует'
+            ),
+            (
+                {'email': 'other@yamdb.fake', 'username': 'Valid_Username'},
+                '"Valid_Username" уже существует'
+            ),
+        )
+        for data, message in cases:
+            response = client.post(URL_SIGNUP, data=data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что email и username уникальны без учета '
+                'регистра.'
+            )
+            assert message in response.json()['non_field_errors']
+        assert CustomUser.objects.count() == 1
+        with pytest.raises(IntegrityError):
+            CustomUser.objects.create(
+                username='VALID_USERNAME', email='new@yamdb.fake'
+            )
+
+    def test_03_concurrent_duplicate_signup(self, client, monkeypatch):
+        issue = views.issue_confirmation_code
+        calls = []
+
+        def issue_after_race(*args):
+            calls.append(args)
+            if len(calls) == 1:
+                # Параллельный запрос успел создать пользователя.
+                CustomUser.objects.create(
+                    confirmation_code='000000', **VALID_DATA
+                )
+                return None
+            return issue(*args)
+
+        monkeypatch.setattr(
+            views, 'issue_confirmation_code', issue_after_race
+        )
+        response = client.post(URL_SIGNUP, data=VALID_DATA)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что одновременная регистрация с одинаковыми данными '
+            'возвращает ответ со статусом 200.'
+        )
+        user = CustomUser.objects.get()
+        assert user.confirmation_code != '000000'
+        assert user.confirmation_code in mail.outbox[-1].body
+
+    def test_04_admin_create_case_insensitive(self, client, admin_client):
+        client.post(URL_SIGNUP, data=VALID_DATA)
+        response = admin_client.post('/api/v1/users/', data={
+            'email': 'new@yamdb.fake', 'username': 'VALID_USERNAME'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что администратор не может создать пользователя, '
+            'чье имя отличается от занятого только регистром.'
+        )
+
+    def test_05_case_insensitive_indexes(self):
+        constraints = connection.introspection.get_constraints(
+            connection.cursor(), CustomUser._meta.db_table
+        )
+        for name in INDEXES:
+            assert constraints.get(name, {}).get('unique'), (
+                f'Проверьте, что уникальный индекс `{name}` есть в БД: '
+                'его могла удалить миграция, пересоздавшая таблицу.'
+            )
+
+    def test_06_migration_reports_case_duplicates(self):
+        call_command('migrate', 'users', '0005', verbosity=0)
+        try:
+            for username in ('Dup', 'dup'):
+                CustomUser.objects.create(
+                    username=username, email=f'{username}@yamdb.fake'
+                )
+            with pytest.raises(CommandError, match="username 'dup'"):
+                call_command('migrate', 'users', verbosity=0)
+            CustomUser.objects.filter(username='dup').delete()
+        finally:
+            call_command('migrate', 'users', verbosity=0)
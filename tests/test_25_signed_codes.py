@@ -0,0 +1,94 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import core
+from users.models import CustomUser
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+URL_TOKEN = '/api/v1/auth/token/'
+VALID_DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+
+@pytest.fixture
+def stateless(settings):
+    settings.CONFIRMATION_CODE_STATELESS = True
+
+
+def get_sent_code():
+    return mail.outbox[-1].body.split()[2]
+
+
+def get_token(client, code):
+    return client.post(URL_TOKEN, data={
+        'username': VALID_DATA['username'], 'confirmation_code': code
+    })
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SignedCodes:
+
+    def test_01_resend_does_not_write(self, client, stateless):
+        client.post(URL_SIGNUP, data=VALID_DATA)
+        code = get_sent_code()
+        assert code != CustomUser.objects.get().confirmation_code, (
+            'Проверьте, что подписанный код не хранится в базе.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(URL_SIGNUP, data=VALID_DATA)
+        assert response.status_code == HTTPStatus.OK
+        assert not any(
+            query['sql'].startswith('UPDATE "users_customuser"')
+            for query in context.captured_queries
+        ), 'Проверьте, что повторная отправка кода не пишет в базу.'
+        assert get_sent_code() == code
+
+    def test_02_token_with_single_lookup(self, client, stateless):
+        client.post(URL_SIGNUP, data=VALID_DATA)
+        assert get_token(client, 'a' * 16).status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = get_token(client, get_sent_code())
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что подписанный код принимается при получении токена.'
+        )
+        assert 'token' in response.json()
+        assert len(context) == 1, (
+            'Проверьте, что токен выдается после одного запроса '
+            'пользователя.'
+        )
+
+    def test_03_code_expires(self, client, stateless, settings,
+                             monkeypatch):
+        client.post(URL_SIGNUP, data=VALID_DATA)
+        code = get_sent_code()
+        now = time.time()
+        ttl = settings.CONFIRMATION_CODE_TTL.total_seconds()
+        monkeypatch.setattr(core.time, 'time', lambda: now + ttl)
+        assert get_token(client, code).status_code == HTTPStatus.OK, (
+            'Проверьте, что код действует и в следующем окне времени.'
+        )
+        monkeypatch.setattr(core.time, 'time', lambda: now + 2 * ttl)
+        assert get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что код перестает действовать через два окна.'
+
+    def test_04_code_bound_to_user_nonce(self, client, stateless):
+        client.post(URL_SIGNUP, data=VALID_DATA)
+        code = get_sent_code()
+        CustomUser.objects.update(confirmation_code='new-nonce')
+        assert get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что смена соли пользователя отзывает код.'
+
+    def test_05_stored_code_token_single_lookup(self, client):
+        client.post(URL_SIGNUP, data=VALID_DATA)
+        with CaptureQueriesContext(connection) as context:
+            response = get_token(client, get_sent_code())
+        assert response.status_code == HTTPStatus.OK
+        assert len(context) == 1
@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.authentication import make_access_token, user_cache
+
+URL = '/api/v1/categories/'
+
+
+def count_user_queries(client, method='get', url=URL, data=None):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data=data)
+    return response, sum(
+        'FROM "users_customuser"' in query['sql']
+        for query in context.captured_queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26AuthCache:
+
+    def test_01_cached_user_no_queries(self, user_client):
+        user_cache.clear()
+        response, first = count_user_queries(user_client)
+        assert response.status_code == HTTPStatus.OK
+        assert first == 1
+        response, second = count_user_queries(user_client)
+        assert response.status_code == HTTPStatus.OK
+        assert second == 0, (
+            'Проверьте, что повторный запрос с тем же токеном не загружает '
+            'пользователя из базы.'
+        )
+
+    def test_02_role_change_invalidates(self, user_client, admin_client,
+                                        user):
+        data = {'name': 'Книги', 'slug': 'books'}
+        response = user_client.post(URL, data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        response = user_client.post(URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что смена роли сразу сбрасывает снимок '
+            'пользователя в кэше аутентификации.'
+        )
+        user.delete()
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что удаленный пользователь не аутентифицируется.'
+        )
+
+    def test_03_me_returns_full_profile(self, user_client, user):
+        user_client.get(URL)
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['email'] == user.email
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'first_name': 'Имя'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.first_name == 'Имя'
+        assert user.bio == 'user bio', (
+            'Проверьте, что изменение профиля не затирает остальные поля.'
+        )
+
+    def test_04_cache_is_bounded(self, settings):
+        user_cache.clear()
+        settings.AUTH_USER_CACHE_SIZE = 2
+        for user_id in range(1, 4):
+            user_cache.set(user_id, {'id': user_id})
+        assert len(user_cache) == 2
+        assert user_cache.get(1) is None, (
+            'Проверьте, что из кэша вытесняется давно не использованный '
+            'пользователь.'
+        )
+        settings.AUTH_USER_CACHE_TTL = 0
+        user_cache.set(5, {'id': 5})
+        assert user_cache.get(5) is None, (
+            'Проверьте, что записи кэша устаревают по TTL.'
+        )
+
+    def test_05_role_claims(self, settings, moderator):
+        settings.JWT_ROLE_CLAIMS = True
+        user_cache.clear()
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {make_access_token(moderator)}'
+        )
+        response, queries = count_user_queries(client, 'get', URL)
+        assert response.status_code == HTTPStatus.OK
+        assert queries == 0, (
+            'Проверьте, что с ролью в токене пользователь не загружается '
+            'из базы.'
+        )
+        response = client.post(URL, data={'name': 'Книги', 'slug': 'books'})
+        assert response.status_code == HTTPStatus.FORBIDDEN
@@ -0,0 +1,144 @@
+import os
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.throttling import FileBucketStore, get_store, take_token
+from reviews.models import Category, Title
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates
+        }
+    return set_rates
+
+
+def signup(client, number, ip='10.0.0.1', **extra):
+    return client.post(URL_SIGNUP, data={
+        'email': f'user{number}@yamdb.fake', 'username': f'user{number}'
+    }, REMOTE_ADDR=ip, **extra)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Throttling:
+
+    def test_01_signup_throttled_by_ip(self, client, rates):
+        rates(signup='2/min')
+        for number in range(2):
+            assert signup(client, number).status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as context:
+            response = signup(client, 2)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что запросы к `{URL_SIGNUP}` сверх лимита '
+            'возвращают ответ со статусом 429.'
+        )
+        assert int(response['Retry-After']) > 0
+        assert not context.captured_queries, (
+            'Проверьте, что ограничение запросов не обращается к БД.'
+        )
+        assert signup(client, 3, ip='10.0.0.2').status_code == HTTPStatus.OK
+
+    def test_02_token_throttled(self, client, rates):
+        rates(token='1/min')
+        data = {'username': 'nobody', 'confirmation_code': '123456'}
+        client.post('/api/v1/auth/token/', data=data)
+        response = client.post('/api/v1/auth/token/', data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+    def test_03_only_review_writes_throttled(self, client, user_client,
+                                             rates):
+        rates(reviews='1/min')
+        category = Category.objects.create(name='Книги', slug='books')
+        titles = [
+            Title.objects.create(name=name, year=2000, category=category)
+            for name in ('Первое', 'Второе')
+        ]
+        url = f'/api/v1/titles/{titles[0].id}/reviews/'
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        for _ in range(3):
+            assert client.get(url).status_code == HTTPStatus.OK, (
+                'Проверьте, что чтение отзывов не ограничивается.'
+            )
+        response = user_client.post(
+            f'/api/v1/titles/{titles[1].id}/reviews/',
+            data={'text': 'Отзыв', 'score': 5}
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что создание отзывов ограничено лимитом `reviews`.'
+        )
+
+    def test_04_shared_file_store(self, settings, tmp_path, client, rates):
+        settings.THROTTLE_STORE = 'file'
+        settings.THROTTLE_FILE_PATH = tmp_path
+        first, second = FileBucketStore(), FileBucketStore()
+        assert first.consume('key', 2, 1 / 60, 100) == 0
+        assert second.consume('key', 2, 1 / 60, 100) == 0
+        assert first.consume('key', 2, 1 / 60, 100) > 0, (
+            'Проверьте, что корзины в файлах общие для всех процессов.'
+        )
+        assert second.consume('other', 2, 1 / 60, 100) == 0
+        rates(signup='1/min')
+        assert signup(client, 0).status_code == HTTPStatus.OK
+        assert signup(client, 1).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+        get_store().clear()
+        assert not list(tmp_path.iterdir())
+
+    def test_05_bucket_refills(self):
+        state, wait = take_token(None, 2, 0.5, 0)
+        assert wait == 0
+        state, wait = take_token(state, 2, 0.5, 0)
+        state, wait = take_token(state, 2, 0.5, 0)
+        assert wait == 2
+        state, wait = take_token(state, 2, 0.5, 2)
+        assert wait == 0, (
+            'Проверьте, что корзина пополняется со временем.'
+        )
+
+    def test_06_file_store_is_bounded(self, settings, tmp_path, rates):
+        settings.THROTTLE_FILE_PATH = tmp_path
+        settings.THROTTLE_MAX_KEYS = 3
+        rates(signup='5/min')
+        store = FileBucketStore()
+        for number in range(10):
+            store.consume(f'ip:{number}', 5, 5 / 60, time.time())
+        store.sweep()
+        assert len(list(tmp_path.iterdir())) == 3, (
+            'Проверьте, что файловое хранилище корзин не хранит больше '
+            'THROTTLE_MAX_KEYS ключей.'
+        )
+        assert store.get_path('ip:9') in {
+            str(path) for path in tmp_path.iterdir()
+        }
+
+        old = time.time() - 61
+        for path in tmp_path.iterdir():
+            os.utime(path, (old, old))
+        store.sweep()
+        assert not list(tmp_path.iterdir()), (
+            'Проверьте, что файлы полных (давно не использованных) корзин '
+            'удаляются.'
+        )
+
+    def test_07_forwarded_for_ignored(self, client, rates):
+        rates(signup='2/min')
+        statuses = [
+            signup(
+                client, number, HTTP_X_FORWARDED_FOR=f'192.0.2.{number}'
+            ).status_code
+            for number in range(3)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что ограничение запросов анонима нельзя обойти, '
+            'меняя заголовок `X-Forwarded-For`.'
+        )
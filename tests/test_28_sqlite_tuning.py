@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+from django.db import connection
+
+from api.sqlite import apply_pragmas, get_pragmas, run_sqlite_benchmark
+
+
+def pragma(cursor, name):
+    cursor.execute(f'PRAGMA {name}')
+    return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28SqliteTuning:
+
+    def test_01_connection_pragmas(self, settings):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Только для SQLite.')
+        with connection.cursor() as cursor:
+            assert pragma(cursor, 'synchronous') == 1, (
+                'Проверьте, что новые соединения получают '
+                'synchronous=NORMAL.'
+            )
+            assert pragma(cursor, 'busy_timeout') == 5000
+            assert pragma(cursor, 'temp_store') == 2
+            assert pragma(cursor, 'cache_size') == -20000
+        assert settings.DATABASES['default']['CONN_MAX_AGE'] > 0, (
+            'Проверьте, что соединения с БД переиспользуются.'
+        )
+
+    def test_02_wal_on_file_database(self, settings, tmp_path):
+        db = sqlite3.connect(tmp_path / 'db.sqlite3')
+        apply_pragmas(db, get_pragmas())
+        assert pragma(db.cursor(), 'journal_mode') == 'wal'
+        db.close()
+        settings.SQLITE_TUNING = False
+        assert get_pragmas() == {}
+
+    def test_03_mixed_load_benchmark(self):
+        report = run_sqlite_benchmark(
+            seconds=0.2, readers=2, writers=1, titles=10, reviews=100
+        )
+        assert set(report) == {'off', 'on'}
+        for mode, result in report.items():
+            assert result['reads_per_s'] > 0, (
+                f'Проверьте, что в режиме {mode} выполняются чтения.'
+            )
+            assert result['writes_per_s'] > 0
+        assert report['on']['errors'] == 0, (
+            'Проверьте, что с настройками SQLite запись не падает с '
+            'ошибкой блокировки.'
+        )
@@ -0,0 +1,132 @@
+import sqlite3
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connection, connections
+
+from api.routers import StickyFileBasedCache, get_client_key
+from reviews.models import Category, Review, Title
+
+REPLICA = 'replica'
+
+
+@pytest.fixture
+def replica(settings, tmp_path, admin, user, moderator):
+    """Снимок основной БД в отдельном файле SQLite как реплика."""
+    if connection.vendor != 'sqlite':
+        pytest.skip('Только для SQLite.')
+    category = Category.objects.create(name='Книги', slug='books')
+    title = Title.objects.create(name='Произведение', year=2000,
+                                 category=category)
+    Review.objects.create(title=title, author=moderator, text='Старый',
+                          score=5)
+    path = tmp_path / 'replica.sqlite3'
+    connection.ensure_connection()
+    target = sqlite3.connect(path)
+    connection.connection.backup(target)
+    target.close()
+    connections.databases[REPLICA] = {
+        **connections.databases['default'], 'NAME': str(path)
+    }
+    settings.DATABASE_REPLICAS = [REPLICA]
+    settings.CACHES = {
+        **settings.CACHES,
+        'sticky': {
+            'BACKEND': 'api.routers.StickyFileBasedCache',
+            'LOCATION': str(tmp_path / 'sticky'),
+        },
+    }
+    cache.clear()
+    yield title, path
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+
+
+def get_texts(client, title):
+    response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+    assert response.status_code == HTTPStatus.OK
+    return {review['text'] for review in response.json()['results']}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29ReplicaRouter:
+
+    def test_01_reads_from_replica_writes_to_primary(self, replica,
+                                                     user_client,
+                                                     admin_client):
+        title, path = replica
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Новый', 'score': 8}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert Review.objects.using('default').filter(text='Новый').exists()
+        with sqlite3.connect(path) as replica_db:
+            assert not replica_db.execute(
+                "SELECT 1 FROM reviews_review WHERE text = 'Новый'"
+            ).fetchall(), 'Проверьте, что запись идет в основную БД.'
+
+        assert get_texts(admin_client, title) == {'Старый'}, (
+            'Проверьте, что GET-запросы к отзывам читают из реплики.'
+        )
+        assert get_texts(user_client, title) == {'Старый', 'Новый'}, (
+            'Проверьте, что после записи клиент читает из основной БД.'
+        )
+
+    def test_02_stickiness_expires(self, replica, user_client, settings):
+        title, path = replica
+        settings.REPLICA_STICKY_SECONDS = 0
+        user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Новый', 'score': 8}
+        )
+        assert get_texts(user_client, title) == {'Старый'}, (
+            'Проверьте, что по истечении окна клиент снова читает из '
+            'реплики.'
+        )
+
+    def test_03_other_views_read_primary(self, replica, admin_client,
+                                         django_user_model):
+        django_user_model.objects.create_user(
+            username='fresh', email='fresh@yamdb.fake'
+        )
+        response = admin_client.get('/api/v1/users/?search=fresh')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 1, (
+            'Проверьте, что представления без `read_from_replica` читают '
+            'из основной БД.'
+        )
+
+    def test_04_stickiness_shared_between_processes(self, replica,
+                                                    user_client, tmp_path):
+        title, _ = replica
+        user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Новый', 'score': 8}
+        )
+        # Кэш другого процесса: отдельный экземпляр бэкенда.
+        other = FileBasedCache(str(tmp_path / 'sticky'), {})
+        request = SimpleNamespace(META=user_client._credentials)
+        assert other.get(get_client_key(request)), (
+            'Проверьте, что отметка о записи хранится в общем кэше и '
+            'видна другим процессам.'
+        )
+
+    def test_05_sticky_cache_culls_expired_first(self, tmp_path):
+        sticky = StickyFileBasedCache(
+            str(tmp_path / 'sticky'),
+            {'OPTIONS': {'MAX_ENTRIES': 4, 'CULL_FREQUENCY': 1}}
+        )
+        for number in range(3):
+            sticky.set(f'expired-{number}', True, -1)
+        sticky.set('live-0', True, 60)
+        for number in range(1, 4):
+            sticky.set(f'live-{number}', True, 60)
+        assert all(sticky.get(f'live-{number}') for number in range(4)), (
+            'Проверьте, что при переполнении кэша отметок сначала '
+            'удаляются истекшие отметки, а не живые.'
+        )
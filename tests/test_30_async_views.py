@@ -0,0 +1,120 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from api.benchmark import run_concurrency_benchmark
+from api.throttling import TokenBucketThrottle
+from api.views import ReviewsViewSet
+from reviews.models import Category, Comment, Review, Title
+
+
+@pytest.fixture
+def title_with_reviews(user, moderator):
+    category = Category.objects.create(name='Книги', slug='books')
+    title = Title.objects.create(name='Произведение', year=2000,
+                                 category=category)
+    review = Review.objects.create(title=title, author=user, text='Отзыв',
+                                   score=7)
+    Review.objects.create(title=title, author=moderator, text='Еще',
+                          score=3)
+    Comment.objects.create(review=review, author=moderator, text='Ответ')
+    cache.clear()
+    return title, review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30AsyncViews:
+
+    def test_01_same_data_as_sync(self, client, title_with_reviews):
+        title, review = title_with_reviews
+        for path in (
+            f'/api/v1/titles/{title.id}/',
+            f'/api/v1/titles/{title.id}/reviews/?limit=1',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+        ):
+            sync = client.get(path)
+            response = client.get(path.replace('/v1/', '/v1/async/', 1))
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к асинхронному `{path}` '
+                'возвращает ответ со статусом 200.'
+            )
+            data, expected = response.json(), sync.json()
+            if 'results' in expected:
+                expected.pop('next')
+                data.pop('next')
+            assert data == expected, (
+                f'Проверьте, что асинхронный `{path}` возвращает те же '
+                'данные, что и синхронный.'
+            )
+
+    def test_02_not_found(self, client, title_with_reviews):
+        title, review = title_with_reviews
+        other = Title.objects.create(name='Другое', year=2001)
+        for path in (
+            f'/api/v1/async/titles/{other.id + 1}/',
+            f'/api/v1/async/titles/{other.id + 1}/reviews/',
+            f'/api/v1/async/titles/{other.id}/reviews/{review.id}/comments/',
+        ):
+            response = client.get(path)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET-запрос к `{path}` с несуществующим '
+                'или чужим родителем возвращает ответ со статусом 404.'
+            )
+
+    def test_03_read_only(self, user_client, title_with_reviews):
+        title, _ = title_with_reviews
+        response = user_client.post(
+            f'/api/v1/async/titles/{title.id}/reviews/',
+            data={'text': 'Новый', 'score': 5}, format='json'
+        )
+        assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED, (
+            'Проверьте, что асинхронные представления принимают только '
+            'GET-запросы.'
+        )
+        assert not Review.objects.filter(text='Новый').exists()
+
+    def test_04_same_auth_and_throttles_as_sync(self, client, user_client,
+                                                title_with_reviews, settings,
+                                                monkeypatch):
+        title, _ = title_with_reviews
+        path = f'/api/v1/titles/{title.id}/reviews/'
+        async_path = path.replace('/v1/', '/v1/async/', 1)
+        response = user_client.get(async_path)
+        assert response.status_code == HTTPStatus.OK
+        for url in (path, async_path):
+            response = client.get(url, HTTP_AUTHORIZATION='Bearer invalid')
+            assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+                f'Проверьте, что GET-запрос к `{url}` с недействительным '
+                'токеном возвращает ответ со статусом 401.'
+            )
+            assert 'WWW-Authenticate' in response
+
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'reviews': '1/min'}
+        }
+        monkeypatch.setattr(
+            ReviewsViewSet, 'throttle_classes', (TokenBucketThrottle,)
+        )
+        assert client.get(async_path).status_code == HTTPStatus.OK
+        response = client.get(async_path)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что асинхронные представления применяют '
+            'ограничение запросов синхронных.'
+        )
+        assert int(response['Retry-After']) > 0
+
+    def test_05_concurrency_benchmark(self, title_with_reviews):
+        report = run_concurrency_benchmark(concurrency=4, requests=8)
+        assert set(report) == {
+            'title-detail', 'reviews-list', 'comments-list'
+        }
+        for name, modes in report.items():
+            for mode in ('wsgi', 'asgi'):
+                result = modes[mode]
+                assert result['statuses'] == {HTTPStatus.OK: 8}, (
+                    f'Проверьте, что в бенчмарке `{name}` ({mode}) все '
+                    'запросы успешны.'
+                )
+                assert result['throughput_rps'] > 0
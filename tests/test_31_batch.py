@@ -0,0 +1,140 @@
+import json
+import logging
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from api.benchmark import run_benchmark
+from api.views import TitleViewSet
+from reviews.models import Category, Comment, Review, Title
+
+BATCH_URL = '/api/v1/batch/'
+
+
+@pytest.fixture
+def title_page(user, moderator):
+    category = Category.objects.create(name='Книги', slug='books')
+    title = Title.objects.create(name='Произведение', year=2000,
+                                 category=category)
+    reviews = [
+        Review.objects.create(title=title, author=author, text='Отзыв',
+                              score=score)
+        for author, score in ((user, 7), (moderator, 3))
+    ]
+    for review in reviews:
+        Comment.objects.create(review=review, author=moderator, text='Ответ')
+    cache.clear()
+    return title, reviews
+
+
+def post_batch(client, data):
+    return client.post(
+        BATCH_URL, data=json.dumps(data), content_type='application/json'
+    )
+
+
+def batch(client, *urls):
+    return post_batch(client, {'requests': [{'url': url} for url in urls]})
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31Batch:
+
+    def test_01_title_page_in_one_request(self, client, title_page):
+        title, reviews = title_page
+        urls = [
+            f'/api/v1/titles/{title.id}/',
+            f'/api/v1/titles/{title.id}/reviews/',
+            *(
+                f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+                for review in reviews
+            ),
+        ]
+        response = batch(client, *urls)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{BATCH_URL}` возвращает ответ '
+            'со статусом 200.'
+        )
+        responses = response.json()['responses']
+        assert len(responses) == len(urls)
+        for url, result in zip(urls, responses):
+            assert result == {
+                'status': HTTPStatus.OK, 'body': client.get(url).json()
+            }, (
+                f'Проверьте, что ответ на вложенный запрос `{url}` совпадает '
+                'с ответом на обычный GET-запрос и идет в порядке запросов.'
+            )
+
+    def test_02_uses_caller_auth(self, client, user_client, user):
+        urls = ('/api/v1/users/me/',)
+        result = batch(user_client, *urls).json()['responses'][0]
+        assert result['status'] == HTTPStatus.OK
+        assert result['body']['username'] == user.username, (
+            'Проверьте, что вложенные запросы выполняются с авторизацией '
+            'вызывающего.'
+        )
+        result = batch(client, *urls).json()['responses'][0]
+        assert result['status'] == HTTPStatus.UNAUTHORIZED
+
+    def test_03_subrequest_errors(self, admin_client, title_page):
+        title, _ = title_page
+        responses = batch(
+            admin_client,
+            '/api/v1/unknown/',
+            f'/api/v1/titles/{title.id + 1}/',
+            '/api/v1/export/titles/',
+            f'/api/v1/async/titles/{title.id}/',
+            f'/api/v1/titles/?year={title.year}',
+        ).json()['responses']
+        assert [result['status'] for result in responses] == [
+            HTTPStatus.NOT_FOUND, HTTPStatus.NOT_FOUND,
+            HTTPStatus.BAD_REQUEST, HTTPStatus.NOT_FOUND, HTTPStatus.OK
+        ], (
+            'Проверьте, что ошибки вложенных запросов возвращаются в их '
+            'ответах и не прерывают пакет.'
+        )
+        assert responses[-1]['body']['count'] == 1
+
+    def test_04_invalid_batch(self, client, settings):
+        max_requests = settings.BATCH_MAX_REQUESTS
+        for data in (
+            {'requests': []},
+            {'requests': [{'url': '/api/v1/titles/'}] * (max_requests + 1)},
+            {'requests': [{'url': 'https://example.com/api/v1/titles/'}]},
+            {'requests': [{'url': '/api/v1/titles/', 'method': 'POST'}]},
+        ):
+            response = post_batch(client, data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что POST-запрос к `{BATCH_URL}` с пустым '
+                'пакетом, пакетом больше BATCH_MAX_REQUESTS, внешним адресом '
+                'или не GET-запросом возвращает ответ со статусом 400.'
+            )
+
+    def test_05_subrequest_budget(self, client, title_page, settings,
+                                  monkeypatch, caplog):
+        title, _ = title_page
+        settings.DEBUG = True
+        monkeypatch.setattr(TitleViewSet, 'query_budget', {'retrieve': 1})
+        with caplog.at_level(logging.WARNING, logger='api.query_budget'):
+            batch(client, f'/api/v1/titles/{title.id}/reviews/')
+            assert not caplog.records
+            batch(client, f'/api/v1/titles/{title.id}/')
+        assert len(caplog.records) == 1, (
+            'Проверьте, что в режиме DEBUG вложенные запросы сверх бюджета '
+            'своего представления попадают в лог.'
+        )
+        assert 'retrieve' in caplog.records[0].getMessage()
+
+    def test_06_benchmark(self, title_page):
+        parts = ('titles-retrieve', 'reviews-list', 'comments-list')
+        report = run_benchmark(
+            iterations=1, scenarios=('batch-title-page', *parts)
+        )
+        assert report['batch-title-page']['statuses'] == {HTTPStatus.OK: 1}
+        assert report['batch-title-page']['queries_max'] == sum(
+            report[name]['queries_max'] for name in parts
+        ), (
+            'Проверьте, что бенчмарк учитывает SQL-запросы вложенных '
+            'запросов пакета.'
+        )
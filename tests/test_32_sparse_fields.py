@@ -0,0 +1,140 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.benchmark import run_benchmark
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def titles(user, moderator):
+    category = Category.objects.create(name='Книги', slug='books')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    titles = []
+    for number in range(3):
+        title = Title.objects.create(name=f'Произведение {number}',
+                                     year=2000 + number, category=category,
+                                     description='Описание')
+        title.genre.set([genre])
+        review = Review.objects.create(title=title, author=user,
+                                       text='Отзыв', score=number + 5)
+        Comment.objects.create(review=review, author=moderator,
+                               text='Ответ')
+        titles.append(title)
+    cache.clear()
+    return titles
+
+
+def get(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+        'статусом 200.'
+    )
+    return response.json(), context.captured_queries
+
+
+@pytest.mark.django_db(transaction=True)
+class Test32SparseFields:
+
+    def test_01_titles(self, client, titles):
+        full, _ = get(client, '/api/v1/titles/')
+        cache.clear()
+        data, queries = get(client, '/api/v1/titles/?fields=id,name,rating')
+        assert data['count'] == full['count']
+        assert data['results'] == [
+            {field: title[field] for field in ('id', 'name', 'rating')}
+            for title in full['results']
+        ], (
+            'Проверьте, что с параметром `fields` ответ на GET-запрос к '
+            '`/api/v1/titles/` содержит только перечисленные поля.'
+        )
+        sql = ' '.join(query['sql'] for query in queries)
+        assert 'reviews_genretitle' not in sql, (
+            'Проверьте, что без поля `genre` жанры не загружаются.'
+        )
+        assert 'description' not in sql and 'category' not in sql, (
+            'Проверьте, что загружаются только столбцы запрошенных полей.'
+        )
+
+    def test_02_title_detail_with_relations(self, client, titles):
+        title = titles[0]
+        full, _ = get(client, f'/api/v1/titles/{title.id}/')
+        data, _ = get(client, f'/api/v1/titles/{title.id}/?fields=genre,'
+                              'category')
+        assert data == {
+            'genre': full['genre'], 'category': full['category']
+        }, (
+            'Проверьте, что вложенные поля `genre` и `category` выводятся '
+            'так же, как без параметра `fields`.'
+        )
+
+    def test_03_nested_and_users(self, client, admin_client, user, titles):
+        title = titles[0]
+        review = title.reviews.get()
+        for url, fields in (
+            (f'/api/v1/titles/{title.id}/reviews/', ('id', 'author')),
+            (f'/api/v1/titles/{title.id}/reviews/?pagination=cursor',
+             ('score',)),
+            (f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+             ('text', 'author')),
+            ('/api/v1/users/', ('username', 'role')),
+            (f'/api/v1/users/{user.username}/', ('email',)),
+        ):
+            http = admin_client if 'users' in url else client
+            full, _ = get(http, url)
+            separator = '&' if '?' in url else '?'
+            data, _ = get(
+                http, f'{url}{separator}fields={",".join(fields)}'
+            )
+            full = full.get('results', [full])
+            data = data.get('results', [data])
+            assert data == [
+                {field: item[field] for field in fields} for item in full
+            ], (
+                f'Проверьте, что с параметром `fields` ответ на GET-запрос '
+                f'к `{url}` содержит только перечисленные поля.'
+            )
+
+    def test_04_invalid_and_writes(self, client, admin_client, titles):
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное поле в `fields` дает ответ со '
+            'статусом 400.'
+        )
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[0].id}/?fields=id',
+            data={'year': 1999}, format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['year'] == 1999, (
+            'Проверьте, что параметр `fields` не влияет на изменение '
+            'объектов.'
+        )
+
+    def test_05_benchmark(self, titles):
+        report = run_benchmark(
+            iterations=1,
+            scenarios=(
+                'titles-list', 'titles-list-sparse',
+                'reviews-list', 'reviews-list-sparse'
+            )
+        )
+        for name in ('titles-list', 'reviews-list'):
+            full, sparse = report[name], report[f'{name}-sparse']
+            assert sparse['queries_max'] <= full['queries_max'], (
+                f'Проверьте, что `{name}` с `fields` выполняет не больше '
+                'SQL-запросов.'
+            )
+            assert sparse['bytes_mean'] < full['bytes_mean'], (
+                f'Проверьте, что ответ `{name}` с `fields` меньше.'
+            )
+        assert (report['titles-list-sparse']['queries_max']
+                < report['titles-list']['queries_max']), (
+            'Проверьте, что список произведений без `genre` не загружает '
+            'жанры отдельным запросом.'
+        )
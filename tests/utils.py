@@ -1,5 +1,11 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from api.middleware import get_query_budget, resolve_action
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +311,70 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def count_queries(client, method, url, data=None):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, data=data)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    assert response.status_code < HTTPStatus.BAD_REQUEST, (
+        f'Проверьте, что {method.upper()}-запрос к `{url}` выполняется '
+        f'успешно. Получен статус {response.status_code}.'
+    )
+    return len(context)
+
+
+def get_url_budget(method, url):
+    match = resolve(url.split('?')[0])
+    action = resolve_action(match.func, method)
+    budget = get_query_budget(match.func.cls, action)
+    assert budget is not None, (
+        f'Проверьте, что для действия `{action}` представления '
+        f'`{match.func.cls.__name__}` задан бюджет SQL-запросов.'
+    )
+    return action, budget
+
+
+def check_query_budget(client, url, page_sizes=(1, 5, 20)):
+    """
+    Запрашивает список страницами разного размера и проверяет, что число
+    SQL-запросов укладывается в бюджет и не растет вместе со страницей.
+    """
+    action, budget = get_url_budget('get', url)
+    separator = '&' if '?' in url else '?'
+    counts = [
+        count_queries(client, 'get', f'{url}{separator}limit={size}')
+        for size in page_sizes
+    ]
+    assert max(counts) <= budget, (
+        f'Проверьте, что GET-запрос к `{url}` ({action}) выполняет не '
+        f'больше {budget} SQL-запросов. Сейчас: {max(counts)}.'
+    )
+    assert counts[-1] <= counts[0], (
+        f'Проверьте, что число SQL-запросов к `{url}` не зависит от '
+        f'размера страницы. Для страниц {page_sizes}: {counts}.'
+    )
+
+
+def get_query_plans(client, url, table):
+    """
+    Выполняет GET-запрос и возвращает планы (EXPLAIN QUERY PLAN SQLite)
+    запросов с ORDER BY, читающих таблицу table.
+    """
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+        'статусом 200.'
+    )
+    plans = []
+    for query in context.captured_queries:
+        sql = query['sql']
+        if 'ORDER BY' not in sql or f'FROM "{table}"' not in sql:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plans.append([row[-1] for row in cursor.fetchall()])
+    assert plans, f'Не найден запрос списка к таблице {table} для `{url}`.'
+    return plans